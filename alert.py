@@ -108,12 +108,13 @@ def check_and_alert(password: str = "") -> dict:
         return {"status": "no_new_events", "count": 0}
 
     # Nur wenn relevante Keywords enthalten
-    trigger_keywords = cfg.get("radar.alerts.trigger_keywords", [])
-    relevant = [
-        e for e in events
-        if any(kw.lower() in (e.get("message", "") + e.get("event_type", "")).lower()
-               for kw in trigger_keywords)
-    ] if trigger_keywords else events
+    trigger_keywords = cfg.get_keywords("radar.alerts.trigger_keywords")
+
+    def _is_relevant(e) -> bool:
+        text = (e.get("message", "") + e.get("event_type", "")).lower()
+        return any(needle in text for _, needle in trigger_keywords)
+
+    relevant = [e for e in events if _is_relevant(e)] if trigger_keywords else events
 
     if not relevant:
         return {"status": "no_relevant_events", "count": 0}
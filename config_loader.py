@@ -5,6 +5,9 @@ from pathlib import Path
 import yaml
 
 _CONFIG = None
+_GET_CACHE = {}  # key -> aufgelöster Wert (oder _MISSING)
+_KEYWORD_CACHE = {}  # key -> ((keyword, keyword.lower()), ...)
+_MISSING = object()
 
 
 def load_config(path: str = None) -> dict:
@@ -18,14 +21,41 @@ def load_config(path: str = None) -> dict:
     return _CONFIG
 
 
+def reload_config(path: str = None) -> dict:
+    """Liest die Konfiguration neu ein und verwirft alle gecachten Lookups."""
+    global _CONFIG
+    _CONFIG = None
+    _GET_CACHE.clear()
+    _KEYWORD_CACHE.clear()
+    return load_config(path)
+
+
 def get(key: str, default=None):
     """Zugriff auf verschachtelte Keys mit Punkt-Notation z.B. 'radar.topic'"""
-    cfg = load_config()
-    keys = key.split(".")
-    val = cfg
-    for k in keys:
+    try:
+        val = _GET_CACHE[key]
+    except KeyError:
+        val = _GET_CACHE[key] = _resolve(key)
+    return default if val is _MISSING else val
+
+
+def get_keywords(key: str) -> tuple:
+    """
+    Keyword-Liste als ((keyword, keyword.lower()), ...) – klein geschrieben
+    wird einmal pro Konfiguration statt bei jedem Vergleich.
+    """
+    try:
+        return _KEYWORD_CACHE[key]
+    except KeyError:
+        pairs = _KEYWORD_CACHE[key] = tuple((kw, kw.lower()) for kw in get(key, []) or [])
+        return pairs
+
+
+def _resolve(key: str):
+    val = load_config()
+    for k in key.split("."):
         if isinstance(val, dict) and k in val:
             val = val[k]
         else:
-            return default
+            return _MISSING
     return val
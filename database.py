@@ -249,20 +249,31 @@ def get_stats():
 def update_company_analysis(company_id, kategorie, vertrauen, begruendung="",
                              ki_anwendungen=None, biografie="", analyzed_at=None):
     """Aktualisiert die Analyse einer Firma (für Re-Analyse)."""
-    import json
-    from datetime import datetime
+    update_analysis_bulk([{
+        "company_id": company_id, "kategorie": kategorie, "vertrauen": vertrauen,
+        "begruendung": begruendung, "ki_anwendungen": ki_anwendungen,
+        "biografie": biografie, "analyzed_at": analyzed_at,
+    }])
+
+
+def update_analysis_bulk(rows: list):
+    """
+    Speichert mehrere Re-Analysen mit einem executemany und einem Commit.
+    rows: Dicts mit den Argumenten von update_company_analysis
+    Der Zeitpunkt steht in analyses.analyzed_at (get_all_companies liest ihn von dort).
+    """
+    if not rows:
+        return
+    now = datetime.now().isoformat()
     conn = get_connection()
-    ts = analyzed_at or datetime.now().isoformat()
-    ki_json = json.dumps(ki_anwendungen or [], ensure_ascii=False)
-    conn.execute("""
+    conn.executemany("""
         INSERT INTO analyses
             (company_id, kategorie, vertrauen, begruendung, ki_anwendungen, biografie, analyzed_at)
         VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (company_id, kategorie, vertrauen, begruendung, ki_json, biografie, ts))
-    # analyzed_at in companies-Tabelle aktualisieren
-    conn.execute("""
-        UPDATE companies SET analyzed_at = ? WHERE id = ?
-    """, (ts, company_id))
+    """, [(r["company_id"], r["kategorie"], r["vertrauen"], r.get("begruendung", ""),
+           json.dumps(r.get("ki_anwendungen") or [], ensure_ascii=False),
+           r.get("biografie", ""), r.get("analyzed_at") or now)
+          for r in rows])
     conn.commit()
     conn.close()
 
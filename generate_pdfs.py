@@ -5,8 +5,6 @@ basierend auf bekannten Unternehmensinformationen.
 import database
 import pdf_export
 
-database.init_db()
-
 # ── Basler AG ──
 basler_company = {
     "name": "Basler AG",
@@ -92,20 +90,30 @@ buhck_analysis = {
     ),
 }
 
-print("Generiere Basler AG PDF...")
-pdf1 = pdf_export.generate_company_profile(basler_company, basler_analysis)
-print(f"OK: {pdf1}")
 
-print("Generiere Buhck Gruppe PDF...")
-pdf2 = pdf_export.generate_company_profile(buhck_company, buhck_analysis)
-print(f"OK: {pdf2}")
+def main():
+    database.init_db()
+
+    print("Generiere Steckbriefe...")
+    pdf1, pdf2 = pdf_export.generate_company_profiles_batch([
+        (basler_company, basler_analysis),
+        (buhck_company, buhck_analysis),
+    ])
+    print(f"OK: {pdf1}")
+    print(f"OK: {pdf2}")
+
+    print("Generiere Uebersichts-PDF...")
+    # Nur die Felder, die die Übersichtstabelle liest – keine Kopie des ganzen Dicts
+    overview_data = [
+        {"name": c["name"], "city": c["city"], "industry": c["industry"],
+         "kategorie": a["kategorie"], "vertrauen": a["vertrauen"]}
+        for c, a in ((basler_company, basler_analysis), (buhck_company, buhck_analysis))
+    ]
+    pdf3 = pdf_export.generate_overview_pdf(overview_data)
+    print(f"OK: {pdf3}")
+
+    print("\nAlle PDFs fertig!")
 
-print("Generiere Uebersichts-PDF...")
-overview_data = [
-    {**basler_company, "kategorie": basler_analysis["kategorie"], "vertrauen": basler_analysis["vertrauen"]},
-    {**buhck_company, "kategorie": buhck_analysis["kategorie"], "vertrauen": buhck_analysis["vertrauen"]},
-]
-pdf3 = pdf_export.generate_overview_pdf(overview_data)
-print(f"OK: {pdf3}")
 
-print("\nAlle PDFs fertig!")
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,9 @@ import config_loader as cfg
 
 
 NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
-_CACHE = {}  # Einfacher In-Memory-Cache
+_CACHE = {}  # Einfacher In-Memory-Cache: query -> (lat, lng)
+_NEG_CACHE = {}  # query -> Zeitpunkt des erfolglosen Abrufs
+NEGATIVE_CACHE_TTL = 24 * 3600  # Sekunden bis zum nächsten Versuch
 
 
 def geocode_address(address: str, city: str = "", postal_code: str = "") -> tuple:
@@ -23,6 +25,9 @@ def geocode_address(address: str, city: str = "", postal_code: str = "") -> tupl
 
     if query in _CACHE:
         return _CACHE[query]
+    failed_at = _NEG_CACHE.get(query)
+    if failed_at is not None and time.monotonic() - failed_at < NEGATIVE_CACHE_TTL:
+        return None, None
 
     try:
         time.sleep(1)  # Nominatim-Höflichkeits-Pause
@@ -40,6 +45,7 @@ def geocode_address(address: str, city: str = "", postal_code: str = "") -> tupl
         resp.raise_for_status()
         data = resp.json()
 
+        result = (None, None)
         if data:
             lat = float(data[0]["lat"])
             lng = float(data[0]["lon"])
@@ -52,14 +58,19 @@ def geocode_address(address: str, city: str = "", postal_code: str = "") -> tupl
                     # Koordinaten außerhalb der Region – trotzdem zurückgeben
                     pass
 
-            _CACHE[query] = (lat, lng)
-            return lat, lng
+            result = (lat, lng)
 
     except Exception as e:
+        # Netzwerk-/Serverfehler nicht cachen – beim nächsten Aufruf neu versuchen
         print(f"Geocoding-Fehler für '{query}': {e}")
+        return None, None
 
-    _CACHE[query] = (None, None)
-    return None, None
+    # Einzige Schreibstelle: Treffer dauerhaft, leere Antworten nur für 24 h
+    if result[0] is None:
+        _NEG_CACHE[query] = time.monotonic()
+    else:
+        _CACHE[query] = result
+    return result
 
 
 def geocode_company(company: dict) -> tuple:
@@ -0,0 +1,52 @@
+"""
+html_utils.py – Gemeinsame HTML-Helfer für Scraper und Job-Radar
+Gestreamte Responses begrenzt lesen und Bytes mit dem richtigen Encoding parsen
+"""
+import re
+from functools import lru_cache
+
+import lxml.html
+from lxml import etree
+
+_CHARSET_RE = re.compile(r"""charset\s*=\s*["']?([\w.:-]+)""", re.I)
+_META_CHARSET_RE = re.compile(rb"<meta[^>]+charset", re.I)
+
+
+def header_charset(resp):
+    """Charset aus dem Content-Type-Header – nur wenn der Server ihn explizit angibt."""
+    match = _CHARSET_RE.search(resp.headers.get("Content-Type", ""))
+    return match.group(1) if match else None
+
+
+@lru_cache(maxsize=16)
+def _html_parser(encoding: str):
+    return lxml.html.HTMLParser(encoding=encoding)
+
+
+def parse_html(content: bytes, encoding: str = None):
+    """
+    Parst HTML-Bytes mit lxml; None bei leerem/kaputtem Dokument.
+    Encoding: Header-Charset, sonst <meta charset> (erkennt lxml selbst),
+    sonst UTF-8 – ohne Angabe würde libxml2 Latin-1 annehmen.
+    """
+    parser = None
+    if not encoding and not _META_CHARSET_RE.search(content, 0, 4096):
+        encoding = "utf-8"
+    try:
+        parser = _html_parser(encoding.lower()) if encoding else None
+    except LookupError:
+        pass  # unbekanntes Charset – lxml entscheidet
+    try:
+        return lxml.html.document_fromstring(content, parser=parser)
+    except (etree.ParserError, ValueError):
+        return None
+
+
+def read_capped(resp, limit: int) -> bytes:
+    """Liest einen gestreamten Response-Body, höchstens limit Bytes."""
+    buf = bytearray()
+    for chunk in resp.iter_content(chunk_size=64 * 1024):
+        buf += chunk
+        if len(buf) >= limit:
+            break
+    return bytes(buf[:limit])
@@ -2,9 +2,15 @@
 job_radar.py – KI-Stellenanzeigen-Erkennung auf Unternehmenswebsites
 Nur öffentliche Karriereseiten der Unternehmen selbst – 100% legal
 """
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from html_utils import header_charset, parse_html, read_capped
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; StormarnKI-Radar/1.0; +https://stormarn.de)",
@@ -35,6 +41,17 @@ KI_JOB_KEYWORDS = {
     "predictive":              6,
 }
 
+# Byte-Suchmuster je Keyword für den Vorfilter auf dem rohen HTML: das längste
+# ASCII-Wort (UTF-8). Es muss im HTML stehen, wenn das Keyword im Seitentext
+# vorkommt – auch wenn Tags oder Umlaut-Entities im Keyword liegen.
+KI_JOB_KEYWORDS_B = {
+    kw: max((w for w in kw.split() if w.isascii()), key=len, default=kw).encode()
+    for kw in KI_JOB_KEYWORDS
+}
+
+# Keywords nach Score absteigend (stabil) – der erste Treffer ist der stärkste
+_KI_ITEMS_SORTED = tuple(sorted(KI_JOB_KEYWORDS.items(), key=lambda x: -x[1]))
+
 # Typische Karriereseiten-Pfade
 CAREER_PATHS = [
     "/karriere",
@@ -51,10 +68,58 @@ CAREER_PATHS = [
     "/team/jobs",
 ]
 
+# Gleichzeitige Pfad-Anfragen pro Website – höflich gegenüber kleinen Servern
+CAREER_PROBE_WORKERS = 4
+
+# Karriereseiten werden nur bis zu dieser Größe geladen (Stellen stehen oben)
+MAX_CAREER_PAGE_BYTES = 512 * 1024
+
+_local = threading.local()
+
+
+def _get_session() -> requests.Session:
+    """Eine Session pro Thread – Verbindungen werden wiederverwendet."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32,
+                              max_retries=Retry(total=2, backoff_factor=0.3))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _local.session = session
+    return session
+
+
+def _parse_html(content: bytes, encoding: str = None):
+    """Parst HTML mit lxml (C-Parser); Script/Style zählen nicht zum Seitentext."""
+    tree = parse_html(content, encoding)
+    if tree is not None:
+        etree.strip_elements(tree, "script", "style", "template", with_tail=False)
+    return tree
+
+
+def _page_text(tree) -> str:
+    """Sichtbarer Text, Textblöcke mit Leerzeichen getrennt."""
+    return " ".join(t for t in (part.strip() for part in tree.itertext()) if t)
+
+
+def _probe_career_path(url: str) -> bool:
+    """Prüft ob unter der URL eine echte (nicht-leere) Seite liegt."""
+    try:
+        resp = _get_session().get(url, timeout=8, allow_redirects=True)
+        return resp.status_code == 200 and len(resp.content) > 500
+    except Exception:
+        return False
+
 
 def find_career_page(website: str) -> str:
     """
     Findet die Karriereseite eines Unternehmens.
+    Die Pfade werden parallel geprüft; nach dem ersten Treffer kehrt die
+    Funktion sofort zurück. Noch nicht gestartete Prüfungen werden
+    verworfen, bereits laufende (höchstens CAREER_PROBE_WORKERS - 1)
+    laufen im Hintergrund bis zu ihrem Timeout zu Ende.
     Returns: URL der Karriereseite oder ""
     """
     if not website:
@@ -64,27 +129,34 @@ def find_career_page(website: str) -> str:
     if not base.startswith("http"):
         base = "https://" + base
 
-    for path in CAREER_PATHS:
-        try:
-            url = base + path
-            resp = requests.get(url, headers=HEADERS, timeout=8, allow_redirects=True)
-            if resp.status_code == 200 and len(resp.content) > 500:
+    # Alle Pfade parallel prüfen; Treffer in der Reihenfolge von CAREER_PATHS.
+    # Jeder Worker-Thread holt sich seine eigene Session (_get_session).
+    urls = [base + path for path in CAREER_PATHS]
+    pool = ThreadPoolExecutor(max_workers=CAREER_PROBE_WORKERS)
+    try:
+        futures = [pool.submit(_probe_career_path, url) for url in urls]
+        for url, future in zip(urls, futures):
+            if future.result():
                 return url
-            time.sleep(0.3)
-        except Exception:
-            continue
+    finally:
+        # Nicht auf laufende Anfragen warten – siehe Docstring
+        pool.shutdown(wait=False, cancel_futures=True)
 
     # Fallback: Hauptseite nach Karriere-Links durchsuchen
     try:
-        resp = requests.get(base, headers=HEADERS, timeout=8)
+        resp = _get_session().get(base, timeout=8)
+        tree = None
         if resp.status_code == 200:
-            soup = BeautifulSoup(resp.content, "html.parser")
-            for a in soup.find_all("a", href=True):
-                href = a["href"].lower()
-                text = a.get_text(strip=True).lower()
+            tree = _parse_html(resp.content, header_charset(resp))
+        if tree is not None:
+            for a in tree.iter("a"):
+                full_url = a.get("href")
+                if full_url is None:
+                    continue
+                href = full_url.lower()
+                text = a.text_content().strip().lower()
                 if any(kw in href or kw in text
                        for kw in ["karriere", "jobs", "stellen", "career"]):
-                    full_url = a["href"]
                     if not full_url.startswith("http"):
                         full_url = base + full_url
                     return full_url
@@ -104,17 +176,28 @@ def scan_career_page(career_url: str, company_name: str) -> list:
         return jobs
 
     try:
-        resp = requests.get(career_url, headers=HEADERS, timeout=12)
-        if resp.status_code != 200:
+        with _get_session().get(career_url, timeout=12, stream=True) as resp:
+            if resp.status_code != 200:
+                return jobs
+            content = read_capped(resp, MAX_CAREER_PAGE_BYTES)
+            encoding = header_charset(resp)
+
+        # Vorfilter auf Bytes: ohne Kandidaten muss die Seite nicht geparst werden
+        raw = content.lower()
+        candidates = [(keyword, score) for keyword, score in _KI_ITEMS_SORTED
+                      if KI_JOB_KEYWORDS_B[keyword] in raw]
+        if not candidates:
             return jobs
 
-        soup = BeautifulSoup(resp.content, "html.parser")
-        text_lower = soup.get_text(" ", strip=True).lower()
+        tree = _parse_html(content, encoding)
+        if tree is None:
+            return jobs
+        text_lower = _page_text(tree).lower()
 
-        # Gefundene Keywords sammeln
+        # Gefundene Keywords sammeln (bleiben nach Score sortiert)
         found_keywords = []
         max_score = 0
-        for keyword, score in KI_JOB_KEYWORDS.items():
+        for keyword, score in candidates:
             if keyword in text_lower:
                 found_keywords.append((keyword, score))
                 max_score = max(max_score, score)
@@ -122,11 +205,11 @@ def scan_career_page(career_url: str, company_name: str) -> list:
         if found_keywords:
             # Job-Titel aus Überschriften extrahieren
             job_titles = []
-            for tag in soup.find_all(["h2", "h3", "h4", "li", "a"]):
-                title = tag.get_text(strip=True)
+            for tag in tree.iter("h2", "h3", "h4", "li", "a"):
+                title = tag.text_content().strip()
                 if 5 < len(title) < 80:
                     title_lower = title.lower()
-                    for keyword, score in KI_JOB_KEYWORDS.items():
+                    for keyword, score in found_keywords:
                         if keyword in title_lower:
                             job_titles.append({
                                 "title": title,
@@ -152,7 +235,7 @@ def scan_career_page(career_url: str, company_name: str) -> list:
 
             # Falls keine konkreten Titel: allgemeinen Eintrag erstellen
             if not jobs and found_keywords:
-                top_kw = sorted(found_keywords, key=lambda x: x[1], reverse=True)[0]
+                top_kw = found_keywords[0]
                 jobs.append({
                     "title": f"KI-relevante Inhalte gefunden: '{top_kw[0]}'",
                     "company": company_name,
@@ -195,6 +278,40 @@ def analyze_company_jobs(company_name: str, website: str = "") -> dict:
     }
 
 
+def analyze_companies_jobs(companies: list, max_workers: int = 16,
+                           progress_callback=None) -> list:
+    """
+    Job-Analyse für viele Unternehmen parallel (HTTP-lastig, daher Threads).
+
+    Args:
+        companies: Liste von Dicts mit name und optional website
+        max_workers: Anzahl gleichzeitig geprüfter Unternehmen
+        progress_callback: Funktion(current, total, message), aufgerufen
+            sobald ein Unternehmen fertig ist
+
+    Returns: Liste der Ergebnis-Dicts (wie analyze_company_jobs, plus company)
+             in der Reihenfolge von companies
+    """
+    results = [None] * len(companies)
+    total = len(companies)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(analyze_company_jobs, c["name"], c.get("website", "")): i
+            for i, c in enumerate(companies)
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            name = companies[i]["name"]
+            result = future.result()
+            result["company"] = name
+            results[i] = result
+            if progress_callback:
+                progress_callback(done, total, f"💼 {name} – {result['signal_strength']}")
+
+    return results
+
+
 def _signal_strength(max_score: int, count: int) -> str:
     if max_score >= 9 and count >= 2:
         return "🔴 Sehr stark – Firma investiert intensiv in KI"
@@ -2,6 +2,9 @@
 ki_scorer.py – KI-Reifegrad Scoring System (1-10)
 Bewertet Unternehmen nach ihrem KI-Einsatz
 """
+from bisect import bisect_right
+
+import numpy as np
 
 # Scoring-Gewichte
 KATEGORIE_SCORE = {
@@ -11,6 +14,13 @@ KATEGORIE_SCORE = {
     "KEIN_KI": 0
 }
 
+# Erklärungstext je Kategorie (unbekannte Kategorien -> "Kein KI erkennbar")
+_KAT_TEXT = {
+    "ECHTER_EINSATZ": "Echter KI-Einsatz nachgewiesen",
+    "INTEGRATION": "KI in Integration",
+    "BUZZWORD": "KI nur als Marketing",
+}
+
 VERTRAUEN_BONUS = {
     range(90, 101): 2,
     range(70, 90): 1,
@@ -18,6 +28,13 @@ VERTRAUEN_BONUS = {
     range(0, 50): -1
 }
 
+# Lookup-Tabelle Vertrauen (0-100) -> Bonus, aus VERTRAUEN_BONUS abgeleitet
+_VBONUS = tuple(
+    next((bonus for r, bonus in VERTRAUEN_BONUS.items() if v in r), 0)
+    for v in range(101)
+)
+_VBONUS_ARR = np.array(_VBONUS, dtype=np.int16)
+
 KI_KEYWORDS_ADVANCED = [
     ("machine learning", 3), ("deep learning", 3), ("neural network", 3),
     ("computer vision", 3), ("nlp", 2), ("llm", 3), ("gpt", 2),
@@ -26,6 +43,21 @@ KI_KEYWORDS_ADVANCED = [
     ("datenanalyse", 1), ("predictive", 2), ("chatbot", 1)
 ]
 
+MAX_KEYWORD_BONUS = 3
+
+# Level-Schwellen (Score >= Schwelle) und Anzeige je Level, aufsteigend
+LEVEL_SCHWELLEN = (2, 4, 6, 8)
+LEVELS = (
+    ("Kein KI",       "⚪", "#BDC3C7"),
+    ("KI-Beobachter", "🟡", "#F1C40F"),
+    ("KI-Einsteiger", "🔵", "#3498DB"),
+    ("KI-Aktiv",      "⭐", "#2ECC71"),
+    ("KI-Vorreiter",  "🏆", "#27AE60"),
+)
+
+# Höchste Punkte zuerst – so ist das Maximum meist nach wenigen Suchen erreicht
+_KEYWORDS_BY_POINTS = tuple(sorted(KI_KEYWORDS_ADVANCED, key=lambda kp: -kp[1]))
+
 
 def calculate_ki_score(kategorie: str, vertrauen: int, 
                         ki_anwendungen: list = None,
@@ -39,20 +71,10 @@ def calculate_ki_score(kategorie: str, vertrauen: int,
     score = KATEGORIE_SCORE.get(kategorie, 0)
     
     # Vertrauen-Bonus
-    v_bonus = 0
-    for score_range, bonus in VERTRAUEN_BONUS.items():
-        if vertrauen in score_range:
-            v_bonus = bonus
-            break
-    score += v_bonus
+    score += _vertrauen_bonus(vertrauen)
     
     # Keyword-Bonus aus Raw Text
-    keyword_bonus = 0
-    if raw_text:
-        text_lower = raw_text.lower()
-        for keyword, points in KI_KEYWORDS_ADVANCED:
-            if keyword in text_lower:
-                keyword_bonus = min(keyword_bonus + points, 3)
+    keyword_bonus = _keyword_bonus(raw_text.lower()) if raw_text else 0
     score += keyword_bonus
     
     # KI-Anwendungen Bonus
@@ -64,26 +86,7 @@ def calculate_ki_score(kategorie: str, vertrauen: int,
     score = max(1, min(10, score + 1))
     
     # Level bestimmen
-    if score >= 8:
-        level = "KI-Vorreiter"
-        badge = "🏆"
-        color = "#27AE60"
-    elif score >= 6:
-        level = "KI-Aktiv"
-        badge = "⭐"
-        color = "#2ECC71"
-    elif score >= 4:
-        level = "KI-Einsteiger"
-        badge = "🔵"
-        color = "#3498DB"
-    elif score >= 2:
-        level = "KI-Beobachter"
-        badge = "🟡"
-        color = "#F1C40F"
-    else:
-        level = "Kein KI"
-        badge = "⚪"
-        color = "#BDC3C7"
+    level, badge, color = LEVELS[bisect_right(LEVEL_SCHWELLEN, score)]
     
     erklaerung = _build_erklaerung(kategorie, vertrauen, keyword_bonus, ki_anwendungen)
     
@@ -96,26 +99,74 @@ def calculate_ki_score(kategorie: str, vertrauen: int,
     }
 
 
+def calculate_ki_scores_batch(kategorien, vertrauen, app_counts,
+                              keyword_bonuses) -> dict:
+    """
+    Vektorisierte Variante von calculate_ki_score für viele Unternehmen.
+
+    Args:
+        kategorien: Kategorie je Unternehmen
+        vertrauen: Vertrauen (0-100) je Unternehmen
+        app_counts: Anzahl nicht-leerer KI-Anwendungen je Unternehmen
+        keyword_bonuses: Ergebnis von _keyword_bonus je Unternehmen
+
+    Returns:
+        dict mit Arrays score und level_idx (Index in LEVELS), zeilengleich
+    """
+    kategorien = np.asarray(kategorien)
+    vertrauen = np.asarray(vertrauen)
+
+    score = np.zeros(len(kategorien), dtype=np.int16)
+    for kategorie, points in KATEGORIE_SCORE.items():
+        score[kategorien == kategorie] = points
+
+    # Vertrauen-Bonus (außerhalb 0-100 oder nicht ganzzahlig kein Bonus, wie im Einzelfall)
+    in_range = (vertrauen >= 0) & (vertrauen <= 100) & (vertrauen % 1 == 0)
+    score += np.where(in_range,
+                      _VBONUS_ARR[np.where(in_range, vertrauen, 0).astype(np.intp)],
+                      0).astype(np.int16)
+
+    score += np.asarray(keyword_bonuses, dtype=np.int16)
+    score += np.minimum(np.asarray(app_counts, dtype=np.int16), 2)
+
+    score = np.clip(score + 1, 1, 10)
+    level_idx = np.searchsorted(LEVEL_SCHWELLEN, score, side="right")
+
+    return {"score": score, "level_idx": level_idx}
+
+
+def _vertrauen_bonus(vertrauen) -> int:
+    """Bonus aus VERTRAUEN_BONUS – wie `vertrauen in range(...)` nur für ganze Werte 0-100."""
+    if 0 <= vertrauen <= 100 and vertrauen == int(vertrauen):
+        return _VBONUS[int(vertrauen)]
+    return 0
+
+
+def _keyword_bonus(text_lower: str) -> int:
+    """Summe der Keyword-Punkte, gedeckelt – bricht ab sobald der Deckel erreicht ist."""
+    bonus = 0
+    for keyword, points in _KEYWORDS_BY_POINTS:
+        if keyword in text_lower:
+            bonus += points
+            if bonus >= MAX_KEYWORD_BONUS:
+                return MAX_KEYWORD_BONUS
+    return bonus
+
+
 def _build_erklaerung(kategorie, vertrauen, keyword_bonus, ki_anwendungen):
-    parts = []
-    if kategorie == "ECHTER_EINSATZ":
-        parts.append("Echter KI-Einsatz nachgewiesen")
-    elif kategorie == "INTEGRATION":
-        parts.append("KI in Integration")
-    elif kategorie == "BUZZWORD":
-        parts.append("KI nur als Marketing")
-    else:
-        parts.append("Kein KI erkennbar")
+    text = _KAT_TEXT.get(kategorie, "Kein KI erkennbar")
+    tail = []
     
     if vertrauen >= 80:
-        parts.append(f"Hohe Analyse-Sicherheit ({vertrauen}%)")
+        tail.append(f"Hohe Analyse-Sicherheit ({vertrauen}%)")
     
     if keyword_bonus > 0:
-        parts.append("Fortgeschrittene KI-Begriffe gefunden")
+        tail.append("Fortgeschrittene KI-Begriffe gefunden")
     
     if ki_anwendungen:
-        count = len([a for a in ki_anwendungen if a])
+        count = sum(1 for a in ki_anwendungen if a)
         if count > 0:
-            parts.append(f"{count} KI-Anwendungen identifiziert")
+            tail.append(f"{count} KI-Anwendungen identifiziert")
     
-    return " · ".join(parts)
+    # Häufiger Fall ohne Zusätze: Kategorietext direkt, kein join
+    return " · ".join((text, *tail)) if tail else text
@@ -2,9 +2,13 @@
 news_monitor.py – News-Monitoring für Stormarn-Unternehmen
 Sucht automatisch nach Pressemitteilungen und KI-News
 """
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import quote_plus
 import feedparser
 
@@ -17,6 +21,66 @@ KI_NEWS_KEYWORDS = [
     "künstliche intelligenz", "ki ", "machine learning", "automatisierung",
     "digitalisierung", "robotik", "chatbot", "algorithmus", "deep learning"
 ]
+_KI_NEEDLES = tuple(KI_NEWS_KEYWORDS)
+
+# RSS-Ergebnisse werden pro URL zwischengespeichert
+FEED_CACHE_TTL = 30 * 60  # Sekunden
+FEED_CACHE_SIZE = 256
+_FEED_CACHE = {}  # rss_url -> (abgerufen_um, feed)
+_cache_lock = threading.Lock()  # _cached_feed läuft im ThreadPoolExecutor
+
+_local = threading.local()
+
+
+def _get_session() -> requests.Session:
+    """Eine Session pro Thread – Keep-Alive statt neuem TLS-Handshake je Feed."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32,
+                              max_retries=Retry(total=2, backoff_factor=0.3))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _local.session = session
+    return session
+
+
+def _fetch_feed(rss_url: str):
+    """
+    Lädt einen RSS-Feed über die Session und parst ihn mit feedparser.
+    feedparser bekommt nur die Bytes (kein eigener urllib-Abruf); die
+    Response-Header liefern Content-Type/Encoding, damit die Erkennung entfällt.
+    """
+    resp = _get_session().get(rss_url, timeout=10)
+    resp.raise_for_status()
+    return feedparser.parse(
+        resp.content,
+        response_headers={k.lower(): v for k, v in resp.headers.items()},
+        resolve_relative_uris=False,  # Google-News-Links sind absolut
+    )
+
+
+def _cached_feed(rss_url: str, pause: float = 0):
+    """
+    Feed aus dem Cache (höchstens FEED_CACHE_TTL alt) oder frisch geladen.
+    pause: Höflichkeits-Pause nach einem echten Abruf, nicht bei Cache-Treffern
+    """
+    with _cache_lock:
+        hit = _FEED_CACHE.get(rss_url)
+    if hit and time.monotonic() - hit[0] < FEED_CACHE_TTL:
+        return hit[1]
+
+    feed = _fetch_feed(rss_url)
+    with _cache_lock:
+        _FEED_CACHE.pop(rss_url, None)
+        if len(_FEED_CACHE) >= FEED_CACHE_SIZE:
+            _FEED_CACHE.pop(next(iter(_FEED_CACHE)))  # ältesten Eintrag verwerfen
+        _FEED_CACHE[rss_url] = (time.monotonic(), feed)
+
+    if pause:
+        time.sleep(pause)
+    return feed
 
 
 def search_company_news(company_name: str, max_results: int = 5) -> list:
@@ -30,7 +94,7 @@ def search_company_news(company_name: str, max_results: int = 5) -> list:
         query = f"{company_name} KI Digitalisierung"
         rss_url = f"https://news.google.com/rss/search?q={quote_plus(query)}&hl=de&gl=DE&ceid=DE:de"
         
-        feed = feedparser.parse(rss_url)
+        feed = _cached_feed(rss_url, pause=1)
         
         for entry in feed.entries[:max_results]:
             news.append({
@@ -42,19 +106,37 @@ def search_company_news(company_name: str, max_results: int = 5) -> list:
                 "ki_relevant": _is_ki_relevant(entry.get("title", "") + " " + entry.get("summary", ""))
             })
         
-        time.sleep(1)
-        
     except Exception as e:
         print(f"News-Fehler ({company_name}): {e}")
     
     return news
 
 
+def _stormarn_query_news(query: str) -> list:
+    """Holt die Top-3-Einträge einer Stormarn-Suchanfrage."""
+    try:
+        rss_url = f"https://news.google.com/rss/search?q={quote_plus(query)}&hl=de&gl=DE&ceid=DE:de"
+        feed = _cached_feed(rss_url)
+        
+        return [{
+            "title": entry.get("title", ""),
+            "link": entry.get("link", ""),
+            "published": entry.get("published", ""),
+            "source": entry.get("source", {}).get("title", ""),
+            "query": query,
+            "ki_relevant": True
+        } for entry in feed.entries[:3]]
+        
+    except Exception as e:
+        print(f"Stormarn News Fehler: {e}")
+        return []
+
+
 def search_stormarn_ki_news() -> list:
     """
     Sucht allgemeine KI-News aus Stormarn / Schleswig-Holstein.
+    Die Suchanfragen sind unabhängig und laufen parallel.
     """
-    news = []
     queries = [
         "Stormarn Künstliche Intelligenz",
         "Stormarn Digitalisierung Unternehmen",
@@ -63,35 +145,16 @@ def search_stormarn_ki_news() -> list:
         "Bad Oldesloe KI"
     ]
     
-    for query in queries:
-        try:
-            rss_url = f"https://news.google.com/rss/search?q={quote_plus(query)}&hl=de&gl=DE&ceid=DE:de"
-            feed = feedparser.parse(rss_url)
-            
-            for entry in feed.entries[:3]:
-                news.append({
-                    "title": entry.get("title", ""),
-                    "link": entry.get("link", ""),
-                    "published": entry.get("published", ""),
-                    "source": entry.get("source", {}).get("title", ""),
-                    "query": query,
-                    "ki_relevant": True
-                })
-            
-            time.sleep(0.5)
-            
-        except Exception as e:
-            print(f"Stormarn News Fehler: {e}")
+    # map() liefert in Reihenfolge der Queries – Deduplizierung bleibt stabil
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        news = [n for batch in pool.map(_stormarn_query_news, queries) for n in batch]
     
-    # Deduplizieren
-    seen = set()
-    unique = []
+    # Deduplizieren – erster Treffer je Titel gewinnt, Reihenfolge bleibt erhalten
+    unique = {}
     for n in news:
-        if n["title"] not in seen:
-            seen.add(n["title"])
-            unique.append(n)
+        unique.setdefault(n["title"], n)
     
-    return unique
+    return list(unique.values())
 
 
 def search_job_postings_ki(company_name: str) -> list:
@@ -104,7 +167,7 @@ def search_job_postings_ki(company_name: str) -> list:
     try:
         query = f"{company_name} Machine Learning Data Scientist KI"
         rss_url = f"https://news.google.com/rss/search?q={quote_plus(query)}&hl=de&gl=DE&ceid=DE:de"
-        feed = feedparser.parse(rss_url)
+        feed = _cached_feed(rss_url, pause=1)
         
         for entry in feed.entries[:3]:
             title = entry.get("title", "")
@@ -116,8 +179,6 @@ def search_job_postings_ki(company_name: str) -> list:
                     "company": company_name
                 })
         
-        time.sleep(1)
-        
     except Exception as e:
         print(f"Job-Suche Fehler ({company_name}): {e}")
     
@@ -126,5 +187,5 @@ def search_job_postings_ki(company_name: str) -> list:
 
 def _is_ki_relevant(text: str) -> bool:
     """Prüft ob ein Text KI-relevant ist."""
-    text_lower = text.lower()
-    return any(kw in text_lower for kw in KI_NEWS_KEYWORDS)
+    # map über die gebundene __contains__-Methode: kein Generator-Frame je Keyword
+    return any(map(text.lower().__contains__, _KI_NEEDLES))
@@ -2,8 +2,13 @@
 pdf_export.py – PDF-Steckbriefe für Unternehmen
 Verwendet ReportLab (pip install reportlab)
 """
+import html
+import io
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
 from reportlab.lib.pagesizes import A4
@@ -15,6 +20,13 @@ from reportlab.platypus import (SimpleDocTemplate, Paragraph, Spacer,
 
 import config_loader as cfg
 
+# orjson (optional) parst die JSON-Listen aus der DB deutlich schneller
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 EXPORTS_DIR = Path(__file__).parent / "exports"
 EXPORTS_DIR.mkdir(exist_ok=True)
 
@@ -36,10 +48,75 @@ CATEGORY_LABELS = {
 }
 
 
+# Styles einmal pro Prozess aufbauen – für jedes PDF identisch
+_STYLES = getSampleStyleSheet()
+_NORMAL = _STYLES["Normal"]
+_BIO_STYLE = ParagraphStyle(
+    "Bio",
+    parent=_NORMAL,
+    leading=16,
+    textColor=colors.HexColor("#444444")
+)
+# Aufzählung als ein Paragraph: Zeilenabstand inkl. der früheren 0.1cm-Spacer
+_BULLET_STYLE = ParagraphStyle(
+    "Bullets",
+    parent=_NORMAL,
+    leading=_NORMAL.leading + 0.1*cm
+)
+
+# Statische Tabellen-Styles; konfigurierbare Farben werden pro Aufruf ergänzt
+_HEADER_TABLE_STYLE = TableStyle([
+    ("TOPPADDING", (0, 0), (-1, -1), 12),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 12),
+    ("LEFTPADDING", (0, 0), (-1, -1), 12),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("ALIGN", (1, 0), (1, 0), "RIGHT"),
+])
+_BADGE_TABLE_STYLE = TableStyle([
+    ("TOPPADDING", (0, 0), (-1, -1), 8),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+    ("LEFTPADDING", (0, 0), (-1, -1), 12),
+    ("ROUNDEDCORNERS", (0, 0), (-1, -1), 5),
+])
+_INFO_TABLE_STYLE = TableStyle([
+    ("FONTSIZE", (0, 0), (-1, -1), 10),
+    ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+    ("TOPPADDING", (0, 0), (-1, -1), 5),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 5),
+    ("ROWBACKGROUNDS", (0, 0), (-1, -1), [colors.white, colors.HexColor("#f8f9fa")]),
+])
+_OVERVIEW_TABLE_STYLE = TableStyle([
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, -1), 9),
+    ("TOPPADDING", (0, 0), (-1, -1), 6),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+    ("LEFTPADDING", (0, 0), (-1, -1), 6),
+    ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f0f4f8")]),
+    ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#cccccc")),
+])
+
+
+def _esc(text) -> str:
+    """Text für ReportLabs Mini-Markup escapen (&, <, > aus Scraping/LLM)."""
+    return html.escape(str(text), quote=False)
+
+
+def _esc_multiline(text) -> str:
+    """Wie _esc, Zeilenumbrüche bleiben als <br/> erhalten."""
+    return _esc(text).replace("\n", "<br/>")
+
+
+@lru_cache(maxsize=128)
 def _hex_color(hex_str: str):
     return colors.HexColor(hex_str)
 
 
+def _heading(text: str, primary: str) -> Paragraph:
+    """Abschnitts-Überschrift im Steckbrief (jedes Mal neu – Flowables halten Layout-Zustand)."""
+    return Paragraph(f"<font size='13' color='{primary}'><b>{text}</b></font>", _NORMAL)
+
+
 def generate_company_profile(company: dict, analysis: dict) -> str:
     """
     Generiert einen PDF-Steckbrief für ein Unternehmen.
@@ -47,47 +124,52 @@ def generate_company_profile(company: dict, analysis: dict) -> str:
     Returns:
         Pfad zur erstellten PDF-Datei
     """
+    safe_name = "".join(c for c in company["name"] if c.isalnum() or c in " -_")
+    filename = EXPORTS_DIR / f"Steckbrief_{safe_name.replace(' ', '_')}.pdf"
+    filename.write_bytes(generate_company_profile_bytes(company, analysis))
+    return str(filename)
+
+
+def generate_company_profile_bytes(company: dict, analysis: dict) -> bytes:
+    """
+    Wie generate_company_profile, aber ohne Datei: das PDF wird im Speicher
+    gebaut und als Bytes zurückgegeben (z.B. für st.download_button).
+    """
     primary = cfg.get("radar.pdf.primary_color", "#1a5276")
     accent = cfg.get("radar.pdf.accent_color", "#2e86c1")
+    primary_col = _hex_color(primary)
+    accent_col = _hex_color(accent)
     radar_name = cfg.get("radar.name", "Regional Radar")
     footer_text = cfg.get("radar.pdf.footer", "")
+    now = datetime.now()  # ein Zeitpunkt für Kopf- und Fußzeile
 
-    safe_name = "".join(c for c in company["name"] if c.isalnum() or c in " -_")
-    filename = EXPORTS_DIR / f"Steckbrief_{safe_name.replace(' ', '_')}.pdf"
-
+    buf = io.BytesIO()
     doc = SimpleDocTemplate(
-        str(filename),
+        buf,
         pagesize=A4,
         topMargin=2*cm, bottomMargin=2*cm,
         leftMargin=2*cm, rightMargin=2*cm
     )
 
-    styles = getSampleStyleSheet()
     story = []
 
     # ── Header ──
     header_data = [[
-        Paragraph(f"<font color='white' size='16'><b>{radar_name}</b></font>",
-                  styles["Normal"]),
-        Paragraph(f"<font color='white' size='10'>{datetime.now().strftime('%d.%m.%Y')}</font>",
-                  styles["Normal"])
+        Paragraph(f"<font color='white' size='16'><b>{_esc(radar_name)}</b></font>",
+                  _NORMAL),
+        Paragraph(f"<font color='white' size='10'>{now.strftime('%d.%m.%Y')}</font>",
+                  _NORMAL)
     ]]
     header_table = Table(header_data, colWidths=["70%", "30%"])
-    header_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), _hex_color(primary)),
-        ("TOPPADDING", (0, 0), (-1, -1), 12),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 12),
-        ("LEFTPADDING", (0, 0), (-1, -1), 12),
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ("ALIGN", (1, 0), (1, 0), "RIGHT"),
-    ]))
+    header_table.setStyle([("BACKGROUND", (0, 0), (-1, -1), primary_col)])
+    header_table.setStyle(_HEADER_TABLE_STYLE)
     story.append(header_table)
     story.append(Spacer(1, 0.5*cm))
 
     # ── Unternehmensname ──
     story.append(Paragraph(
-        f"<font size='20' color='{primary}'><b>{company['name']}</b></font>",
-        styles["Normal"]
+        f"<font size='20' color='{primary}'><b>{_esc(company['name'])}</b></font>",
+        _NORMAL
     ))
     story.append(Spacer(1, 0.3*cm))
 
@@ -97,28 +179,20 @@ def generate_company_profile(company: dict, analysis: dict) -> str:
     badge_label = CATEGORY_LABELS.get(kategorie, kategorie)
 
     badge_data = [[Paragraph(
-        f"<font color='white' size='11'><b>{badge_label}</b></font>",
-        styles["Normal"]
+        f"<font color='white' size='11'><b>{_esc(badge_label)}</b></font>",
+        _NORMAL
     )]]
     badge_table = Table(badge_data, colWidths=["50%"])
-    badge_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, -1), badge_color),
-        ("TOPPADDING", (0, 0), (-1, -1), 8),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-        ("LEFTPADDING", (0, 0), (-1, -1), 12),
-        ("ROUNDEDCORNERS", (0, 0), (-1, -1), 5),
-    ]))
+    badge_table.setStyle([("BACKGROUND", (0, 0), (-1, -1), badge_color)])
+    badge_table.setStyle(_BADGE_TABLE_STYLE)
     story.append(badge_table)
     story.append(Spacer(1, 0.5*cm))
 
-    story.append(HRFlowable(color=_hex_color(accent), thickness=1, width="100%"))
+    story.append(HRFlowable(color=accent_col, thickness=1, width="100%"))
     story.append(Spacer(1, 0.3*cm))
 
     # ── Stammdaten ──
-    story.append(Paragraph(
-        f"<font size='13' color='{primary}'><b>Unternehmensdaten</b></font>",
-        styles["Normal"]
-    ))
+    story.append(_heading("Unternehmensdaten", primary))
     story.append(Spacer(1, 0.2*cm))
 
     info_rows = [
@@ -130,13 +204,7 @@ def generate_company_profile(company: dict, analysis: dict) -> str:
     ]
 
     info_table = Table(info_rows, colWidths=["30%", "70%"])
-    info_table.setStyle(TableStyle([
-        ("FONTSIZE", (0, 0), (-1, -1), 10),
-        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-        ("TOPPADDING", (0, 0), (-1, -1), 5),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 5),
-        ("ROWBACKGROUNDS", (0, 0), (-1, -1), [colors.white, colors.HexColor("#f8f9fa")]),
-    ]))
+    info_table.setStyle(_INFO_TABLE_STYLE)
     story.append(info_table)
     story.append(Spacer(1, 0.5*cm))
 
@@ -144,90 +212,109 @@ def generate_company_profile(company: dict, analysis: dict) -> str:
     ki_anwendungen = analysis.get("ki_anwendungen", [])
     if isinstance(ki_anwendungen, str):
         try:
-            ki_anwendungen = json.loads(ki_anwendungen)
-        except Exception:
+            ki_anwendungen = _json_loads(ki_anwendungen)
+        except ValueError:  # auch orjson.JSONDecodeError
             ki_anwendungen = []
 
     if ki_anwendungen:
-        story.append(Paragraph(
-            f"<font size='13' color='{primary}'><b>Identifizierte KI-Anwendungen</b></font>",
-            styles["Normal"]
-        ))
+        story.append(_heading("Identifizierte KI-Anwendungen", primary))
         story.append(Spacer(1, 0.2*cm))
-        for app in ki_anwendungen:
-            story.append(Paragraph(f"• {app}", styles["Normal"]))
-            story.append(Spacer(1, 0.1*cm))
-        story.append(Spacer(1, 0.3*cm))
+        # Ein Flowable statt Paragraph+Spacer je Eintrag; Texte escapen (Mini-Markup)
+        bullets = "<br/>".join(f"• {_esc(app)}" for app in ki_anwendungen)
+        story.append(Paragraph(bullets, _BULLET_STYLE))
+        story.append(Spacer(1, 0.4*cm))
 
     # ── Analyse-Begründung ──
     begruendung = analysis.get("begruendung", "")
     if begruendung:
-        story.append(Paragraph(
-            f"<font size='13' color='{primary}'><b>Analyse</b></font>",
-            styles["Normal"]
-        ))
+        story.append(_heading("Analyse", primary))
         story.append(Spacer(1, 0.2*cm))
-        story.append(Paragraph(begruendung, styles["Normal"]))
+        story.append(Paragraph(_esc_multiline(begruendung), _NORMAL))
         story.append(Spacer(1, 0.4*cm))
 
     # ── Biografie ──
     biografie = analysis.get("biografie", "")
     if biografie:
-        story.append(HRFlowable(color=_hex_color(accent), thickness=0.5, width="100%"))
+        story.append(HRFlowable(color=accent_col, thickness=0.5, width="100%"))
         story.append(Spacer(1, 0.3*cm))
-        story.append(Paragraph(
-            f"<font size='13' color='{primary}'><b>Unternehmensbiografie</b></font>",
-            styles["Normal"]
-        ))
+        story.append(_heading("Unternehmensbiografie", primary))
         story.append(Spacer(1, 0.2*cm))
-
-        bio_style = ParagraphStyle(
-            "Bio",
-            parent=styles["Normal"],
-            leading=16,
-            textColor=colors.HexColor("#444444")
-        )
-        story.append(Paragraph(biografie, bio_style))
+        story.append(Paragraph(_esc_multiline(biografie), _BIO_STYLE))
 
     # ── Footer ──
     story.append(Spacer(1, 1*cm))
     story.append(HRFlowable(color=colors.grey, thickness=0.5, width="100%"))
     story.append(Spacer(1, 0.2*cm))
     story.append(Paragraph(
-        f"<font size='8' color='grey'>{footer_text} | Erstellt: {datetime.now().strftime('%d.%m.%Y %H:%M')}</font>",
-        styles["Normal"]
+        f"<font size='8' color='grey'>{_esc(footer_text)} | Erstellt: {now.strftime('%d.%m.%Y %H:%M')}</font>",
+        _NORMAL
     ))
 
     doc.build(story)
-    return str(filename)
+    return buf.getvalue()
+
+
+def _one(item: tuple) -> str:
+    """Worker für den Batch-Export: ein (company, analysis)-Paar -> PDF-Pfad."""
+    company, analysis = item
+    return generate_company_profile(company, analysis)
+
+
+def generate_company_profiles_batch(items: list, max_workers: int = None) -> list:
+    """
+    Generiert PDF-Steckbriefe für viele Unternehmen parallel.
+    Jedes PDF ist unabhängig – ReportLab-Layout ist CPU-gebunden, daher Prozesse.
+
+    Args:
+        items: Liste von (company, analysis)-Tupeln
+        max_workers: Anzahl Prozesse (Standard: CPU-Kerne)
+
+    Returns:
+        Liste der PDF-Pfade in Eingabe-Reihenfolge
+    """
+    if len(items) <= 1:
+        return [_one(item) for item in items]
+
+    workers = min(max_workers or os.cpu_count() or 1, len(items))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_one, items, chunksize=4))
 
 
 def generate_overview_pdf(companies: list) -> str:
     """Generiert ein Übersichts-PDF für alle Unternehmen."""
+    now = datetime.now()  # Dateiname und Datum im PDF aus demselben Zeitpunkt
+    filename = EXPORTS_DIR / f"Uebersicht_{now.strftime('%Y%m%d')}.pdf"
+    filename.write_bytes(generate_overview_pdf_bytes(companies, now))
+    return str(filename)
+
+
+def generate_overview_pdf_bytes(companies: list, now: datetime = None) -> bytes:
+    """Übersichts-PDF im Speicher bauen und als Bytes zurückgeben."""
+    now = now or datetime.now()
     primary = cfg.get("radar.pdf.primary_color", "#1a5276")
+    primary_col = _hex_color(primary)
     radar_name = cfg.get("radar.name", "Regional Radar")
     region = cfg.get("radar.region", "")
     footer_text = cfg.get("radar.pdf.footer", "")
 
-    filename = EXPORTS_DIR / f"Uebersicht_{datetime.now().strftime('%Y%m%d')}.pdf"
-    doc = SimpleDocTemplate(str(filename), pagesize=A4,
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=A4,
                             topMargin=2*cm, bottomMargin=2*cm,
                             leftMargin=2*cm, rightMargin=2*cm)
 
-    styles = getSampleStyleSheet()
     story = []
 
     # Titel
     story.append(Paragraph(
-        f"<font size='22' color='{primary}'><b>{radar_name}</b></font>",
-        styles["Normal"]
+        f"<font size='22' color='{primary}'><b>{_esc(radar_name)}</b></font>",
+        _NORMAL
     ))
     story.append(Paragraph(
-        f"<font size='14' color='grey'>Übersicht – {region} | {datetime.now().strftime('%d.%m.%Y')}</font>",
-        styles["Normal"]
+        f"<font size='14' color='grey'>Übersicht – {_esc(region)} | {now.strftime('%d.%m.%Y')}</font>",
+        _NORMAL
     ))
     story.append(Spacer(1, 0.5*cm))
-    story.append(HRFlowable(color=_hex_color(primary), thickness=2, width="100%"))
+    story.append(HRFlowable(color=primary_col, thickness=2, width="100%"))
     story.append(Spacer(1, 0.5*cm))
 
     # Tabelle
@@ -242,25 +329,16 @@ def generate_overview_pdf(companies: list) -> str:
         ])
 
     table = Table(table_data, colWidths=["30%", "15%", "20%", "25%", "10%"])
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), _hex_color(primary)),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, -1), 9),
-        ("TOPPADDING", (0, 0), (-1, -1), 6),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-        ("LEFTPADDING", (0, 0), (-1, -1), 6),
-        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f0f4f8")]),
-        ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#cccccc")),
-    ]))
+    table.setStyle([("BACKGROUND", (0, 0), (-1, 0), primary_col)])
+    table.setStyle(_OVERVIEW_TABLE_STYLE)
     story.append(table)
 
     # Footer
     story.append(Spacer(1, 1*cm))
     story.append(Paragraph(
-        f"<font size='8' color='grey'>{footer_text} | {len(companies)} Unternehmen analysiert</font>",
-        styles["Normal"]
+        f"<font size='8' color='grey'>{_esc(footer_text)} | {len(companies)} Unternehmen analysiert</font>",
+        _NORMAL
     ))
 
     doc.build(story)
-    return str(filename)
+    return buf.getvalue()
@@ -3,30 +3,68 @@ reanalyzer.py – Zweiter Analyse-Durchlauf & Daten-Aktualität
 1. Unsichere Fälle (Vertrauen < 50%) nochmal tief analysieren
 2. Firmen älter als 30 Tage automatisch neu analysieren
 """
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from datetime import datetime, timedelta
+from functools import lru_cache
+from urllib.parse import urlparse
+import threading
 import time
 
+import config_loader as cfg
 import database as db
 import scraper
 import analyzer
 
 LOW_CONFIDENCE_THRESHOLD = 50
 STALE_DAYS = 30
+BULK_WRITE_SIZE = 50  # Re-Analysen pro DB-Commit
 
 
-def get_uncertain_companies(companies: list = None) -> list:
-    """Firmen mit Vertrauen < 50% oder unbekannter Kategorie."""
+def _host_key(website: str) -> str:
+    """Host einer Website; ohne Schema wie in scrape_website als https:// gelesen."""
+    if not website.startswith("http"):
+        website = "https://" + website
+    return urlparse(website).netloc.lower()
+
+
+def _host_locks(companies: list) -> list:
+    """
+    Ein Lock pro Host für einen Batch: verschiedene Websites laufen parallel,
+    dieselbe nacheinander. Ohne erkennbaren Host kein gemeinsames Lock.
+    """
+    locks = {}
+    return [locks.setdefault(host, threading.Lock()) if host else nullcontext()
+            for host in (_host_key(c.get("website") or "") for c in companies)]
+
+
+def get_uncertain_companies(companies: list = None, _prefiltered: bool = False) -> list:
+    """
+    Firmen mit Vertrauen < 50% oder unbekannter Kategorie.
+    _prefiltered: companies enthält bereits nur Firmen mit Website
+    """
     if companies is None:
         companies = db.get_all_companies()
-    return [c for c in companies if (
-        c.get("kategorie") in ("UNBEKANNT", None, "") or
-        int(c.get("vertrauen") or 0) < LOW_CONFIDENCE_THRESHOLD
-    ) and c.get("website")]
+    if _prefiltered:
+        return [c for c in companies if _is_uncertain(c)]
+    return [c for c in companies if c.get("website") and _is_uncertain(c)]
+
 
+def _is_uncertain(company: dict) -> bool:
+    if company.get("kategorie") in ("UNBEKANNT", None, ""):
+        return True
+    vertrauen = company.get("vertrauen")
+    if type(vertrauen) is int:  # Regelfall aus der DB – kein int()-Aufruf
+        return vertrauen < LOW_CONFIDENCE_THRESHOLD
+    return int(vertrauen or 0) < LOW_CONFIDENCE_THRESHOLD
 
-def reanalyze_company(company: dict, progress_callback=None) -> dict:
+
+def reanalyze_company(company: dict, progress_callback=None,
+                      defer_commit: bool = False) -> dict:
     """
     Tiefer zweiter Analyse-Durchlauf – mehr Unterseiten, mehr Kontext.
+    defer_commit: nicht selbst speichern, sondern das DB-Payload unter
+    "db_payload" zurückgeben (für gesammelte Schreibvorgänge)
     """
     name = company.get("name", "")
     website = company.get("website", "")
@@ -46,19 +84,19 @@ def reanalyze_company(company: dict, progress_callback=None) -> dict:
     classification["pages_scraped"] = scrape_result.get("pages_scraped", 0)
     classification["reanalyzed_at"] = datetime.now().isoformat()
 
-    try:
-        db.update_analysis(
-            company_id=company.get("id"),
-            kategorie=classification["kategorie"],
-            vertrauen=classification["vertrauen"],
-            begruendung=classification["begruendung"],
-            ki_anwendungen=classification.get("ki_anwendungen", []),
-            biografie=biografie
-        )
-    except Exception as e:
-        print(f"DB-Fehler ({name}): {e}")
+    payload = {
+        "company_id":     company.get("id"),
+        "kategorie":      classification["kategorie"],
+        "vertrauen":      classification["vertrauen"],
+        "begruendung":    classification["begruendung"],
+        "ki_anwendungen": classification.get("ki_anwendungen", []),
+        "biografie":      biografie,
+        "analyzed_at":    classification["reanalyzed_at"],
+    }
+    if not defer_commit:
+        _write_analyses([payload])
 
-    return {
+    result = {
         "success":        True,
         "company":        name,
         "old_vertrauen":  int(company.get("vertrauen") or 0),
@@ -68,51 +106,112 @@ def reanalyze_company(company: dict, progress_callback=None) -> dict:
         "pages_scanned":  scrape_result.get("pages_scraped", 0),
         "subpages":       scrape_result.get("subpages", []),
     }
+    if defer_commit:
+        result["db_payload"] = payload
+    return result
+
+
+def _write_analyses(payloads: list):
+    try:
+        db.update_analysis_bulk(payloads)
+    except Exception as e:
+        print(f"DB-Fehler ({len(payloads)} Analysen): {e}")
+
+
+def _reanalyze_polite(company: dict, host_lock) -> dict:
+    """reanalyze_company mit Höflichkeits-Pause pro Host statt global."""
+    with host_lock:
+        try:
+            return reanalyze_company(company, defer_commit=True)
+        except Exception as e:
+            return {"success": False, "error": str(e), "company": company.get("name", "")}
+        finally:
+            time.sleep(cfg.get("radar.scraper.delay_between_requests", 2))
+
+
+def _reanalyze_many(companies: list, label: str, progress_callback=None) -> list:
+    """
+    Analysiert mehrere Firmen parallel neu (Netzwerk + LLM sind I/O-gebunden).
+    Fortschritt wird im aufrufenden Thread gemeldet, Ergebnisse in Eingabe-Reihenfolge.
+    DB-Schreibvorgänge werden gesammelt und alle BULK_WRITE_SIZE Firmen committet.
+    """
+    total = len(companies)
+    results = [None] * total
+    if not companies:
+        return results
+
+    pending = []
+    workers = cfg.get("radar.reanalyzer.workers", 8)
+    locks = _host_locks(companies)  # nur für diesen Aufruf – wächst nicht über die Session
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_reanalyze_polite, c, lock): i
+                   for i, (c, lock) in enumerate(zip(companies, locks))}
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            results[i] = future.result()
+            payload = results[i].pop("db_payload", None)
+            if payload:
+                pending.append(payload)
+                if len(pending) >= BULK_WRITE_SIZE:
+                    _write_analyses(pending)
+                    pending = []
+            if progress_callback:
+                progress_callback(done, total,
+                                  f"{label} {done}/{total}: {companies[i]['name']}")
+    _write_analyses(pending)
+    return results
 
 
 def run_second_pass(progress_callback=None) -> list:
     """Zweiter Durchlauf für alle unsicheren Firmen."""
     uncertain = get_uncertain_companies()
-    results = []
-    for i, company in enumerate(uncertain):
-        if progress_callback:
-            progress_callback(i + 1, len(uncertain),
-                              f"Tiefenanalyse {i+1}/{len(uncertain)}: {company['name']}")
-        results.append(reanalyze_company(company))
-        time.sleep(2)
-    return results
+    return _reanalyze_many(uncertain, "Tiefenanalyse", progress_callback)
 
 
-def get_stale_companies(companies: list = None, days: int = STALE_DAYS) -> list:
-    """Firmen die seit mehr als X Tagen nicht analysiert wurden."""
-    if companies is None:
-        companies = db.get_all_companies()
-    cutoff = datetime.now() - timedelta(days=days)
-    stale = []
+@lru_cache(maxsize=4096)
+def _parse_last_analyzed(last: str):
+    """ISO-Zeitstempel -> naive datetime; None wenn nicht vergleichbar (= veraltet)."""
+    try:
+        last_dt = datetime.fromisoformat(last.split("+")[0].replace("Z", ""))
+    except Exception:
+        return None
+    # Zeitstempel mit Offset lassen sich nicht mit dem naiven Cutoff vergleichen
+    return last_dt if last_dt.tzinfo is None else None
+
+
+def _with_parsed_dates(companies: list, _prefiltered: bool = False) -> list:
+    """(company, last_dt) für alle Firmen mit Website – Datum nur einmal parsen."""
+    parsed = []
     for c in companies:
-        if not c.get("website"):
+        if not _prefiltered and not c.get("website"):
             continue
         last = c.get("last_analyzed") or c.get("created_at")
-        if not last:
-            stale.append(c)
-            continue
-        try:
-            last_dt = datetime.fromisoformat(str(last).split("+")[0].replace("Z", ""))
-            if last_dt < cutoff:
-                stale.append(c)
-        except Exception:
-            stale.append(c)
-    return stale
+        parsed.append((c, _parse_last_analyzed(str(last)) if last else None))
+    return parsed
+
+
+def get_stale_companies(companies: list = None, days: int = STALE_DAYS,
+                        _parsed: list = None) -> list:
+    """Firmen die seit mehr als X Tagen nicht analysiert wurden."""
+    if _parsed is None:
+        if companies is None:
+            companies = db.get_all_companies()
+        _parsed = _with_parsed_dates(companies)
+    cutoff = datetime.now() - timedelta(days=days)
+    return [c for c, last_dt in _parsed if last_dt is None or last_dt < cutoff]
 
 
 def get_freshness_stats(companies: list = None) -> dict:
     """Statistiken über Daten-Aktualität."""
     if companies is None:
         companies = db.get_all_companies()
+    # Website-Filter einmal für alle Teil-Statistiken
+    websited = [c for c in companies if c.get("website")]
+    parsed = _with_parsed_dates(websited, _prefiltered=True)
     total = len(companies)
-    stale_30 = len(get_stale_companies(companies, days=30))
-    stale_7  = len(get_stale_companies(companies, days=7))
-    uncertain = len(get_uncertain_companies(companies))
+    stale_30 = len(get_stale_companies(days=30, _parsed=parsed))
+    stale_7  = len(get_stale_companies(days=7, _parsed=parsed))
+    uncertain = len(get_uncertain_companies(websited, _prefiltered=True))
     analyzed  = len([c for c in companies if c.get("kategorie")])
     return {
         "total":         total,
@@ -128,14 +227,7 @@ def get_freshness_stats(companies: list = None) -> dict:
 def refresh_stale_companies(days: int = STALE_DAYS, progress_callback=None) -> list:
     """Analysiert alle veralteten Firmen neu."""
     stale = get_stale_companies(days=days)
-    results = []
-    for i, company in enumerate(stale):
-        if progress_callback:
-            progress_callback(i + 1, len(stale),
-                              f"Aktualisiere {i+1}/{len(stale)}: {company['name']}")
-        results.append(reanalyze_company(company))
-        time.sleep(2)
-    return results
+    return _reanalyze_many(stale, "Aktualisiere", progress_callback)
 
 
 def get_changes_summary(results: list) -> dict:
@@ -1,6 +1,8 @@
 """
 regional_compare.py – Vergleich Stormarn mit anderen SH-Kreisen
 """
+from functools import lru_cache
+from types import MappingProxyType
 
 # Benchmark-Daten (öffentlich verfügbare Statistiken, Stand 2023)
 KREISE_BENCHMARKS = {
@@ -59,6 +61,8 @@ KREISE_BENCHMARKS = {
         "farbe": "#85C1E9"
     }
 }
+# Werte schreibgeschützt – die Benchmarks werden an Aufrufer direkt herausgegeben
+KREISE_BENCHMARKS = {kreis: MappingProxyType(info) for kreis, info in KREISE_BENCHMARKS.items()}
 
 
 def get_stormarn_ki_quote(analyzed_companies: list) -> float:
@@ -78,40 +82,70 @@ def get_stormarn_ki_quote(analyzed_companies: list) -> float:
 def get_comparison_data(actual_ki_quote: float = None) -> dict:
     """
     Gibt Vergleichsdaten zurück, optional mit echter KI-Quote.
+    Ohne KI-Quote sind das die Benchmark-Daten selbst – nur lesend verwenden.
     """
-    data = KREISE_BENCHMARKS.copy()
+    if actual_ki_quote is None:
+        return KREISE_BENCHMARKS
     
-    if actual_ki_quote is not None:
-        data["Kreis Stormarn"]["ki_quote_est"] = actual_ki_quote
-        data["Kreis Stormarn"]["ki_quote_real"] = True
-    
-    return data
+    # Overlay: nur der Stormarn-Eintrag ist neu, die Benchmarks bleiben unverändert
+    return {
+        **KREISE_BENCHMARKS,
+        "Kreis Stormarn": {
+            **KREISE_BENCHMARKS["Kreis Stormarn"],
+            "ki_quote_est": actual_ki_quote,
+            "ki_quote_real": True,
+        },
+    }
+
+
+def _build_ranking(metric: str, data: dict) -> list:
+    ranking = [(kreis, info.get(metric, 0)) for kreis, info in data.items()]
+    return sorted(ranking, key=lambda x: x[1], reverse=True)
+
 
+# Die KI-Quote ist ein freier float – Cache begrenzen, sonst wächst er in
+# einer lang laufenden App mit jeder neuen Quote
+RANKING_CACHE_SIZE = 256
 
-def get_ranking(metric: str, data: dict = None) -> list:
+
+@lru_cache(maxsize=RANKING_CACHE_SIZE)
+def _ranking_cached(metric: str, actual_ki_quote: float = None) -> tuple:
+    """Ranking auf den Benchmark-Daten – pro (Metrik, KI-Quote) nur einmal sortiert."""
+    return tuple(_build_ranking(metric, get_comparison_data(actual_ki_quote)))
+
+
+def get_ranking(metric: str, data: dict = None, actual_ki_quote: float = None) -> list:
     """
     Erstellt ein Ranking aller Kreise nach einer Metrik.
+    Ohne eigene data wird das Ranking aus dem Cache geliefert.
     Returns: Sortierte Liste von (kreis, wert) Tupeln
     """
-    if data is None:
-        data = KREISE_BENCHMARKS
-    
-    ranking = [(kreis, info.get(metric, 0)) for kreis, info in data.items()]
-    return sorted(ranking, key=lambda x: x[1], reverse=True)
+    if data is not None:
+        return _build_ranking(metric, data)
+    return list(_ranking_cached(metric, actual_ki_quote))
 
 
-def get_stormarn_position(metric: str, data: dict = None) -> dict:
+def get_stormarn_position(metric: str, data: dict = None,
+                          actual_ki_quote: float = None,
+                          include_ranking: bool = True) -> dict:
     """
     Gibt Position von Stormarn im Ranking zurück.
+    include_ranking=False spart die Kopie der Ranking-Liste, wenn nur
+    Position/Wert gebraucht werden.
     """
-    ranking = get_ranking(metric, data)
+    if data is not None:
+        ranking = _build_ranking(metric, data)
+    else:
+        ranking = _ranking_cached(metric, actual_ki_quote)
     for i, (kreis, wert) in enumerate(ranking, 1):
         if kreis == "Kreis Stormarn":
-            return {
+            result = {
                 "position": i,
                 "total": len(ranking),
                 "wert": wert,
                 "besser_als": len(ranking) - i,
-                "ranking": ranking
             }
+            if include_ranking:
+                result["ranking"] = list(ranking)
+            return result
     return {"position": 0, "total": len(ranking), "wert": 0}
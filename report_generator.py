@@ -12,6 +12,8 @@ from reportlab.platypus import (
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 import io
 from datetime import datetime
+from heapq import nlargest
+from operator import itemgetter
 
 
 STORMARN_BLUE = colors.Color(0.102, 0.322, 0.463)
@@ -21,7 +23,94 @@ GRAY = colors.Color(0.95, 0.95, 0.95)
 DARK_GRAY = colors.Color(0.3, 0.3, 0.3)
 
 
-def generate_ihk_report(companies: list, stats: dict, title: str = None) -> bytes:
+# Styles einmal beim Import – für jeden Bericht identisch
+_STYLES = getSampleStyleSheet()
+
+_TITLE_STYLE = ParagraphStyle(
+    "Title", parent=_STYLES["Normal"],
+    fontSize=22, textColor=STORMARN_BLUE,
+    spaceAfter=6, fontName="Helvetica-Bold",
+    alignment=TA_CENTER
+)
+_SUBTITLE_STYLE = ParagraphStyle(
+    "Subtitle", parent=_STYLES["Normal"],
+    fontSize=12, textColor=DARK_GRAY,
+    spaceAfter=20, alignment=TA_CENTER
+)
+_H1_STYLE = ParagraphStyle(
+    "H1", parent=_STYLES["Normal"],
+    fontSize=14, textColor=STORMARN_BLUE,
+    spaceBefore=16, spaceAfter=8,
+    fontName="Helvetica-Bold"
+)
+_H2_STYLE = ParagraphStyle(
+    "H2", parent=_STYLES["Normal"],
+    fontSize=11, textColor=DARK_GRAY,
+    spaceBefore=10, spaceAfter=6,
+    fontName="Helvetica-Bold"
+)
+_BODY_STYLE = ParagraphStyle(
+    "Body", parent=_STYLES["Normal"],
+    fontSize=9, textColor=colors.black,
+    spaceAfter=6, leading=14
+)
+_FOOTER_STYLE = ParagraphStyle(
+    "Footer", parent=_STYLES["Normal"],
+    fontSize=7, textColor=DARK_GRAY,
+    alignment=TA_CENTER
+)
+
+_SUMMARY_TSTYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), STORMARN_BLUE),
+    ("TEXTCOLOR", (0, 0), (-1, 0), WHITE),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, -1), 9),
+    ("ROWBACKGROUNDS", (0, 1), (-1, -1), [GRAY, WHITE]),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.lightgrey),
+    ("PADDING", (0, 0), (-1, -1), 6),
+    ("FONTNAME", (0, 4), (-1, 4), "Helvetica-Bold"),
+    ("TEXTCOLOR", (2, 4), (2, 4), colors.Color(0.1, 0.6, 0.1)),
+])
+
+# Kompakte Tabellen (Top-Firmen, Branchen) teilen sich einen Style
+_COMPACT_TSTYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), STORMARN_BLUE),
+    ("TEXTCOLOR", (0, 0), (-1, 0), WHITE),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, -1), 8),
+    ("ROWBACKGROUNDS", (0, 1), (-1, -1), [GRAY, WHITE]),
+    ("GRID", (0, 0), (-1, -1), 0.3, colors.lightgrey),
+    ("PADDING", (0, 0), (-1, -1), 5),
+])
+
+
+# Spalten der Top-Firmen-Tabelle: (Feld, maximale Länge; None = ungekürzt)
+_FIRM_FIELDS = (("name", 35), ("city", 15), ("industry", 25), ("ki_score", None))
+
+# Ab dieser Zeilenzahl werden Tabellen aufgeteilt – ReportLab plant
+# Seitenumbrüche in einer einzigen großen Tabelle quadratisch teuer
+MAX_TABLE_ROWS = 500
+
+
+def _chunked_table(data: list, col_widths: list, style: TableStyle,
+                   max_rows: int = MAX_TABLE_ROWS) -> list:
+    """
+    Baut eine Tabelle (erste Zeile = Kopf) als Liste von Flowables. Lange
+    Tabellen werden in Blöcke zu max_rows Zeilen mit wiederholtem Kopf geteilt.
+    """
+    header, rows = data[0], data[1:]
+    out = []
+    for i in range(0, max(len(rows), 1), max_rows):
+        if out:
+            out.append(Spacer(1, 0.1*cm))
+        table = Table([header] + rows[i:i + max_rows], colWidths=col_widths, repeatRows=1)
+        table.setStyle(style)
+        out.append(table)
+    return out
+
+
+def generate_ihk_report(companies: list, stats: dict, title: str = None,
+                        compress: bool = True) -> bytes:
     """
     Erstellt einen professionellen IHK-Bericht als PDF.
     
@@ -29,6 +118,7 @@ def generate_ihk_report(companies: list, stats: dict, title: str = None) -> byte
         companies: Liste analysierter Unternehmen
         stats: Statistik-Dict
         title: Berichtstitel
+        compress: Seiten mit zlib komprimieren (False = schneller, größer)
     
     Returns:
         PDF als bytes
@@ -41,39 +131,8 @@ def generate_ihk_report(companies: list, stats: dict, title: str = None) -> byte
         leftMargin=2.5*cm,
         rightMargin=2.5*cm,
         topMargin=2*cm,
-        bottomMargin=2*cm
-    )
-    
-    styles = getSampleStyleSheet()
-    
-    # Custom Styles
-    title_style = ParagraphStyle(
-        "Title", parent=styles["Normal"],
-        fontSize=22, textColor=STORMARN_BLUE,
-        spaceAfter=6, fontName="Helvetica-Bold",
-        alignment=TA_CENTER
-    )
-    subtitle_style = ParagraphStyle(
-        "Subtitle", parent=styles["Normal"],
-        fontSize=12, textColor=DARK_GRAY,
-        spaceAfter=20, alignment=TA_CENTER
-    )
-    h1_style = ParagraphStyle(
-        "H1", parent=styles["Normal"],
-        fontSize=14, textColor=STORMARN_BLUE,
-        spaceBefore=16, spaceAfter=8,
-        fontName="Helvetica-Bold"
-    )
-    h2_style = ParagraphStyle(
-        "H2", parent=styles["Normal"],
-        fontSize=11, textColor=DARK_GRAY,
-        spaceBefore=10, spaceAfter=6,
-        fontName="Helvetica-Bold"
-    )
-    body_style = ParagraphStyle(
-        "Body", parent=styles["Normal"],
-        fontSize=9, textColor=colors.black,
-        spaceAfter=6, leading=14
+        bottomMargin=2*cm,
+        pageCompression=1 if compress else 0,
     )
     
     story = []
@@ -82,20 +141,40 @@ def generate_ihk_report(companies: list, stats: dict, title: str = None) -> byte
     story.append(Spacer(1, 3*cm))
     
     report_title = title or "KI-Radar Kreis Stormarn"
-    story.append(Paragraph(report_title, title_style))
+    story.append(Paragraph(report_title, _TITLE_STYLE))
     story.append(Paragraph(
         f"Analysebericht · Stand: {datetime.now().strftime('%d. %B %Y')}",
-        subtitle_style
+        _SUBTITLE_STYLE
     ))
     
     story.append(HRFlowable(width="100%", thickness=2, color=STORMARN_BLUE))
     story.append(Spacer(1, 1*cm))
     
     # Kennzahlen-Box
+    # Ein Durchlauf über alle Firmen für Zähler, Top-Firmen und Branchen
+    n_analyzed = n_echter = n_integration = 0
+    top_firms = []
+    branchen = {}
+    for c in companies:
+        kategorie = c.get("kategorie")
+        if not kategorie:
+            continue
+        n_analyzed += 1
+        if kategorie == "ECHTER_EINSATZ":
+            n_echter += 1
+            if len(top_firms) < 20:
+                top_firms.append(c)
+        elif kategorie == "INTEGRATION":
+            n_integration += 1
+        else:
+            continue
+        branche = (c.get("industry") or "Unbekannt")[:40]
+        branchen[branche] = branchen.get(branche, 0) + 1
+
     total = stats.get("total", len(companies))
-    analyzed = stats.get("analyzed", len([c for c in companies if c.get("kategorie")]))
-    echter = stats.get("echter_einsatz", len([c for c in companies if c.get("kategorie") == "ECHTER_EINSATZ"]))
-    integration = stats.get("integration", len([c for c in companies if c.get("kategorie") == "INTEGRATION"]))
+    analyzed = stats.get("analyzed", n_analyzed)
+    echter = stats.get("echter_einsatz", n_echter)
+    integration = stats.get("integration", n_integration)
     ki_quote = round((echter + integration) / total * 100, 1) if total > 0 else 0
     
     summary_data = [
@@ -109,89 +188,47 @@ def generate_ihk_report(companies: list, stats: dict, title: str = None) -> byte
     ]
     
     summary_table = Table(summary_data, colWidths=[8*cm, 4*cm, 4*cm])
-    summary_table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), STORMARN_BLUE),
-        ("TEXTCOLOR", (0, 0), (-1, 0), WHITE),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("FONTSIZE", (0, 0), (-1, -1), 9),
-        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [GRAY, WHITE]),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.lightgrey),
-        ("PADDING", (0, 0), (-1, -1), 6),
-        ("FONTNAME", (0, 4), (-1, 4), "Helvetica-Bold"),
-        ("TEXTCOLOR", (2, 4), (2, 4), colors.Color(0.1, 0.6, 0.1)),
-    ]))
+    summary_table.setStyle(_SUMMARY_TSTYLE)
     
     story.append(summary_table)
     story.append(Spacer(1, 1*cm))
     
     # ── SEITE 2: DETAILS ──
     story.append(PageBreak())
-    story.append(Paragraph("1. KI-Vorreiter in Stormarn", h1_style))
+    story.append(Paragraph("1. KI-Vorreiter in Stormarn", _H1_STYLE))
     story.append(Paragraph(
         "Die folgenden Unternehmen setzen Künstliche Intelligenz bereits produktiv ein:",
-        body_style
+        _BODY_STYLE
     ))
     
     # Top KI-Firmen
-    top_firms = [c for c in companies if c.get("kategorie") == "ECHTER_EINSATZ"][:20]
-    
     if top_firms:
         firm_data = [["Unternehmen", "Ort", "Branche", "KI-Score"]]
-        for c in top_firms:
-            firm_data.append([
-                str(c.get("name", ""))[:35],
-                str(c.get("city", ""))[:15],
-                str(c.get("industry", ""))[:25],
-                str(c.get("ki_score", ""))
-            ])
+        firm_data.extend(
+            [str(c.get(key, ""))[:max_len] for key, max_len in _FIRM_FIELDS]
+            for c in top_firms
+        )
         
-        firm_table = Table(firm_data, colWidths=[6*cm, 3*cm, 5*cm, 2*cm])
-        firm_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), STORMARN_BLUE),
-            ("TEXTCOLOR", (0, 0), (-1, 0), WHITE),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("FONTSIZE", (0, 0), (-1, -1), 8),
-            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [GRAY, WHITE]),
-            ("GRID", (0, 0), (-1, -1), 0.3, colors.lightgrey),
-            ("PADDING", (0, 0), (-1, -1), 5),
-        ]))
-        story.append(firm_table)
+        story.extend(_chunked_table(firm_data, [6*cm, 3*cm, 5*cm, 2*cm], _COMPACT_TSTYLE))
     else:
-        story.append(Paragraph("Noch keine Firmen analysiert.", body_style))
+        story.append(Paragraph("Noch keine Firmen analysiert.", _BODY_STYLE))
     
     story.append(Spacer(1, 0.5*cm))
     
     # ── BRANCHEN-ANALYSE ──
-    story.append(Paragraph("2. Branchen-Analyse", h1_style))
-    
-    branchen = {}
-    for c in companies:
-        if c.get("kategorie") in ("ECHTER_EINSATZ", "INTEGRATION"):
-            branche = c.get("industry", "Unbekannt") or "Unbekannt"
-            branche = branche[:40]
-            branchen[branche] = branchen.get(branche, 0) + 1
+    story.append(Paragraph("2. Branchen-Analyse", _H1_STYLE))
     
     if branchen:
-        top_branchen = sorted(branchen.items(), key=lambda x: x[1], reverse=True)[:10]
+        top_branchen = nlargest(10, branchen.items(), key=itemgetter(1))
         branch_data = [["Branche", "KI-Firmen"]]
         for b, count in top_branchen:
             branch_data.append([b, str(count)])
         
-        branch_table = Table(branch_data, colWidths=[13*cm, 3*cm])
-        branch_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), STORMARN_BLUE),
-            ("TEXTCOLOR", (0, 0), (-1, 0), WHITE),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("FONTSIZE", (0, 0), (-1, -1), 8),
-            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [GRAY, WHITE]),
-            ("GRID", (0, 0), (-1, -1), 0.3, colors.lightgrey),
-            ("PADDING", (0, 0), (-1, -1), 5),
-        ]))
-        story.append(branch_table)
+        story.extend(_chunked_table(branch_data, [13*cm, 3*cm], _COMPACT_TSTYLE))
     
     # ── EMPFEHLUNGEN ──
     story.append(PageBreak())
-    story.append(Paragraph("3. Handlungsempfehlungen", h1_style))
+    story.append(Paragraph("3. Handlungsempfehlungen", _H1_STYLE))
     
     empfehlungen = [
         ("Förderung der KI-Vorreiter", 
@@ -209,21 +246,16 @@ def generate_ihk_report(companies: list, stats: dict, title: str = None) -> byte
     ]
     
     for titel, text in empfehlungen:
-        story.append(Paragraph(f"• {titel}", h2_style))
-        story.append(Paragraph(text, body_style))
+        story.append(Paragraph(f"• {titel}", _H2_STYLE))
+        story.append(Paragraph(text, _BODY_STYLE))
     
     # ── FOOTER ──
     story.append(Spacer(1, 2*cm))
     story.append(HRFlowable(width="100%", thickness=1, color=STORMARN_BLUE))
-    footer_style = ParagraphStyle(
-        "Footer", parent=styles["Normal"],
-        fontSize=7, textColor=DARK_GRAY,
-        alignment=TA_CENTER
-    )
     story.append(Paragraph(
         f"Stormarn KI-Radar · Erstellt am {datetime.now().strftime('%d.%m.%Y um %H:%M Uhr')} · "
         "Automatisierter Bericht · Daten basieren auf öffentlich zugänglichen Websites",
-        footer_style
+        _FOOTER_STYLE
     ))
     
     doc.build(story)
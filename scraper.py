@@ -2,13 +2,22 @@
 scraper.py – Verbesserter Website-Scraper mit Unterseiten-Fokus
 Scannt Haupt- UND KI-relevante Unterseiten für bessere Analyse-Qualität
 """
+import json
+import sqlite3
 import time
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import lxml.html
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from pathlib import Path
 from urllib.parse import urljoin, urlparse
 
 import config_loader as cfg
+from html_utils import header_charset, parse_html, read_capped
 
 # Unterseiten die KI-Infos enthalten – nach Priorität
 KI_SUBPAGE_KEYWORDS = [
@@ -24,6 +33,14 @@ KI_SUBPAGE_KEYWORDS = [
     "karriere", "jobs",
 ]
 
+# (Keyword, Score) – frühere Keywords = höherer Score
+_SUBPAGE_SCORES = tuple(
+    (kw, len(KI_SUBPAGE_KEYWORDS) - i) for i, kw in enumerate(KI_SUBPAGE_KEYWORDS)
+)
+
+# Links auf Dateien statt Seiten (auch mit Query-String, z.B. "doc.PDF?dl=1")
+_EXT_RE = re.compile(r"\.(?:pdf|jpe?g|png|gif|zip|mp4|docx?|xlsx?)(?:$|\?)", re.I)
+
 
 def _get_headers():
     return {
@@ -32,53 +49,220 @@ def _get_headers():
     }
 
 
-def _clean_text(html_content: str) -> str:
-    soup = BeautifulSoup(html_content, "html.parser")
-    for tag in soup(["script", "style", "nav", "footer", "header",
-                     "aside", "form", "iframe", "noscript", "cookie"]):
-        tag.decompose()
-    text = soup.get_text(separator=" ", strip=True)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+_local = threading.local()
 
 
-def _get_ki_relevant_links(base_url: str, soup: BeautifulSoup, limit: int = 6) -> list:
+def _get_session() -> requests.Session:
+    """
+    Eine Session pro Thread – Keep-Alive über mehrere Seiten und Websites
+    hinweg statt neuer TCP/TLS-Verbindung je Aufruf. Sessions werden nie
+    zwischen Threads geteilt; die langlebigen _SUBPAGE_POOL-Threads halten
+    je eine eigene.
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _local.session = session
+    return session
+
+
+# HTTP-Cache: bereinigter Text (Hauptseite auch Titel + Links) zusammen mit
+# ETag/Last-Modified – unveränderte Seiten kosten beim nächsten Lauf nur ein 304
+CACHE_PATH = Path(__file__).parent / "data" / "scrape_cache.db"
+_cache_lock = threading.Lock()
+_cache_db = None
+
+
+def _cache_conn() -> sqlite3.Connection:
+    global _cache_db
+    if _cache_db is None:
+        CACHE_PATH.parent.mkdir(exist_ok=True)
+        conn = sqlite3.connect(CACHE_PATH, timeout=10, check_same_thread=False)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                title TEXT,
+                text TEXT,
+                links TEXT
+            )
+        """)
+        _cache_db = conn
+    return _cache_db
+
+
+def _cache_get(url: str):
+    """Cache-Eintrag (etag, last_modified, title, text, links) oder None."""
+    if not cfg.get("radar.scraper.http_cache", True):
+        return None
+    try:
+        with _cache_lock:
+            return _cache_conn().execute(
+                "SELECT etag, last_modified, title, text, links FROM pages WHERE url = ?",
+                (url,)
+            ).fetchone()
+    except sqlite3.Error:
+        return None
+
+
+def _cache_put(url: str, resp, title, text: str, links) -> None:
+    """Speichert eine Seite – nur wenn der Server sie später validieren kann."""
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    if not (etag or last_modified) or not cfg.get("radar.scraper.http_cache", True):
+        return
+    try:
+        with _cache_lock:
+            conn = _cache_conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, title, text,
+                 json.dumps(links) if links is not None else None)
+            )
+            conn.commit()
+    except sqlite3.Error as e:
+        print(f"Scrape-Cache-Fehler: {e}")
+
+
+def _conditional_headers(headers: dict, cached) -> dict:
+    """Request-Header, bei vorhandenem Cache-Eintrag mit If-None-Match/If-Modified-Since."""
+    if cached is None:
+        return headers
+    etag, last_modified = cached[0], cached[1]
+    headers = dict(headers)
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+# Seiten werden nur bis zu dieser Größe geladen – vom Text bleiben ohnehin
+# nur die ersten 2.000–20.000 Zeichen
+MAX_PAGE_BYTES = 1024 * 1024
+
+# Ein langlebiger Pool für Unterseiten aller Aufrufe: seine Threads (und damit
+# ihre Thread-lokalen Sessions samt Verbindungen) bleiben erhalten, statt je
+# Website neue Threads und Sessions anzulegen
+SUBPAGE_WORKERS = 16
+_SUBPAGE_POOL = ThreadPoolExecutor(max_workers=SUBPAGE_WORKERS,
+                                   thread_name_prefix="scraper-subpage")
+
+# Unwichtige Tags – werden samt Inhalt vor der Textextraktion entfernt
+_DROP_TAGS = ("script", "style", "nav", "footer", "header",
+              "aside", "form", "iframe", "noscript", "cookie")
+
+
+def _clean_text(html_content: bytes, encoding: str = None) -> str:
+    tree = parse_html(html_content, encoding)
+    if tree is None:
+        return ""
+    return _tree_text(tree)
+
+
+def _tree_text(tree) -> str:
+    """Sichtbarer Fließtext eines geparsten Dokuments. Entfernt Navigation etc. aus dem Baum!"""
+    etree.strip_elements(tree, *_DROP_TAGS, with_tail=False)
+    # str.split() trennt an denselben Unicode-Whitespaces wie r"\s+"
+    return " ".join(" ".join(tree.itertext()).split())
+
+
+def _get_ki_relevant_links(base_url: str, tree, limit: int | None = 6) -> list:
     """
     Findet KI-relevante Unterseiten – priorisiert nach KI-Relevanz.
+    limit=None liefert alle gefundenen Links.
     """
     base_domain = urlparse(base_url).netloc
     priority = {}   # url -> score
 
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
+    for a in tree.iter("a"):
+        href = a.get("href")
+        if href is None:
+            continue
         full_url = urljoin(base_url, href)
-        link_text = (a.get_text(strip=True) + " " + href).lower()
 
         # Nur interne Links
         if urlparse(full_url).netloc != base_domain:
             continue
         if full_url == base_url:
             continue
-        if any(full_url.endswith(ext) for ext in [".pdf", ".jpg", ".png", ".zip", ".mp4"]):
+        if _EXT_RE.search(full_url):
             continue
         if "#" in full_url.split("?")[0].split(base_url)[1:]:
             continue
 
-        # Score basierend auf Keyword-Position in Liste
-        for i, kw in enumerate(KI_SUBPAGE_KEYWORDS):
-            if kw in link_text:
-                score = len(KI_SUBPAGE_KEYWORDS) - i  # Frühere Keywords = höherer Score
-                if full_url not in priority or priority[full_url] < score:
-                    priority[full_url] = score
+        # Score des ersten (= wichtigsten) passenden Keywords
+        link_text = ("".join(t.strip() for t in a.itertext()) + " " + href).lower()
+        score = next((sc for kw, sc in _SUBPAGE_SCORES if kw in link_text), 0)
+        if score and priority.get(full_url, 0) < score:
+            priority[full_url] = score
 
     # Sortiert nach Score
     sorted_links = sorted(priority.items(), key=lambda x: x[1], reverse=True)
     return [url for url, _ in sorted_links[:limit]]
 
 
+def _fetch_subpage(link: str, headers: dict, timeout: int, delay: float) -> str:
+    """Lädt eine Unterseite (nach Höflichkeits-Pause) und gibt den bereinigten Text zurück."""
+    try:
+        time.sleep(delay)
+        cached = _cache_get(link)
+        with _get_session().get(link, headers=_conditional_headers(headers, cached),
+                                timeout=timeout, stream=True) as sub_resp:
+            sub_resp.raise_for_status()
+            if sub_resp.status_code == 304 and cached is not None:
+                return cached[3] or ""
+            content = read_capped(sub_resp, MAX_PAGE_BYTES)
+        text = _clean_text(content, header_charset(sub_resp))
+        _cache_put(link, sub_resp, None, text, None)
+        return text
+    except Exception:
+        return ""
+
+
+# Höchstens per_host gleichzeitige Unterseiten-Abrufe je Host – über alle
+# scrape_website-Aufrufe hinweg (z.B. parallele Re-Analysen derselben Website).
+# Einträge leben nur, solange ein Abruf den Host nutzt.
+_host_slots = {}  # host -> [BoundedSemaphore, Anzahl Nutzer]
+_host_slots_guard = threading.Lock()
+
+
+@contextmanager
+def _host_slot(host: str, limit: int):
+    with _host_slots_guard:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = _host_slots[host] = [threading.BoundedSemaphore(limit), 0]
+        slot[1] += 1
+    try:
+        with slot[0]:
+            yield
+    finally:
+        with _host_slots_guard:
+            slot[1] -= 1
+            if not slot[1]:
+                del _host_slots[host]
+
+
+def _fetch_subpages(links: list, headers: dict, timeout: int, delay: float,
+                    per_host: int) -> list:
+    """Lädt Unterseiten nacheinander – jede nach ihrer Höflichkeits-Pause, im Host-Limit."""
+    texts = []
+    for link in links:
+        with _host_slot(urlparse(link).netloc.lower(), per_host):
+            texts.append(_fetch_subpage(link, headers, timeout, delay))
+    return texts
+
+
 def scrape_website(url: str, deep: bool = False) -> dict:
     """
     Scrapt eine Website inkl. KI-relevanter Unterseiten.
+    Unterseiten laden höchstens radar.scraper.parallel_requests_per_host
+    gleichzeitig je Host – auch wenn mehrere Aufrufe dieselbe Website scrapen.
 
     Args:
         url: Website-URL
@@ -92,7 +276,8 @@ def scrape_website(url: str, deep: bool = False) -> dict:
     if deep:
         max_pages = 10  # Zweiter Durchlauf: mehr Seiten
     delay = cfg.get("radar.scraper.delay_between_requests", 1)
-    keywords = cfg.get("radar.keywords", [])
+    per_host = cfg.get("radar.scraper.parallel_requests_per_host", 2)
+    keywords = cfg.get_keywords("radar.keywords")
 
     if not url.startswith("http"):
         url = "https://" + url
@@ -108,39 +293,60 @@ def scrape_website(url: str, deep: bool = False) -> dict:
     }
 
     try:
-        session = requests.Session()
+        session = _get_session()
         headers = _get_headers()
 
         # ── Hauptseite ──
-        resp = session.get(url, headers=headers, timeout=timeout)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.content, "html.parser")
-
-        title_tag = soup.find("title")
-        result["title"] = title_tag.get_text(strip=True) if title_tag else ""
-
-        main_text = _clean_text(resp.text)
+        cached = _cache_get(url)
+        if cached is not None and cached[4] is None:
+            cached = None  # nur als Unterseite gespeichert – keine Links im Cache
+        with session.get(url, headers=_conditional_headers(headers, cached),
+                         timeout=timeout, stream=True) as resp:
+            resp.raise_for_status()
+            not_modified = resp.status_code == 304 and cached is not None
+            content = b"" if not_modified else read_capped(resp, MAX_PAGE_BYTES)
+        if not_modified:
+            # Unverändert: Titel, Text und Links aus dem Cache, kein Parsen
+            result["title"] = cached[2] or ""
+            main_text = cached[3] or ""
+            extra_links = json.loads(cached[4])[:max_pages - 1]
+        else:
+            # Einmal parsen: Titel und Links zuerst, danach wird der Baum für den Text bereinigt
+            tree = parse_html(content, header_charset(resp))
+            if tree is None:
+                tree = lxml.html.document_fromstring("<html></html>")
+
+            result["title"] = (tree.findtext(".//title") or "").strip()
+            all_links = _get_ki_relevant_links(url, tree, limit=None)
+            extra_links = all_links[:max_pages - 1]
+
+            main_text = _tree_text(tree)
+            _cache_put(url, resp, result["title"], main_text, all_links)
         texts = [f"[Hauptseite]\n{main_text}"]
         result["pages_scraped"] = 1
 
         # ── KI-relevante Unterseiten ──
-        extra_links = _get_ki_relevant_links(url, soup, limit=max_pages - 1)
-
-        for link in extra_links:
-            try:
-                time.sleep(delay)
-                sub_resp = session.get(link, headers=headers, timeout=timeout)
-                sub_resp.raise_for_status()
-
-                sub_text = _clean_text(sub_resp.text)
-                if len(sub_text) > 100:  # Nur sinnvolle Seiten
-                    page_name = link.replace(url, "").strip("/") or "Unterseite"
-                    texts.append(f"[{page_name}]\n{sub_text[:2000]}")
-                    result["subpages"].append(link)
-                    result["pages_scraped"] += 1
 
-            except Exception:
-                continue
+        # Alle Unterseiten liegen auf demselben Host: höchstens per_host Anfragen
+        # gleichzeitig (auch über parallele Aufrufe hinweg, siehe _host_slot) –
+        # die Links werden auf per_host Spuren verteilt, jede Spur lädt ihre
+        # Links nacheinander im gemeinsamen _SUBPAGE_POOL
+        sub_texts = [""] * len(extra_links)
+        lanes = min(per_host, len(extra_links))
+        futures = [
+            _SUBPAGE_POOL.submit(_fetch_subpages, extra_links[i::lanes], headers,
+                                 timeout, delay, per_host)
+            for i in range(lanes)
+        ]
+        for i, future in enumerate(futures):
+            sub_texts[i::lanes] = future.result()
+
+        for link, sub_text in zip(extra_links, sub_texts):
+            if len(sub_text) > 100:  # Nur sinnvolle Seiten
+                page_name = link.replace(url, "").strip("/") or "Unterseite"
+                texts.append(f"[{page_name}]\n{sub_text[:2000]}")
+                result["subpages"].append(link)
+                result["pages_scraped"] += 1
 
         full_text = "\n\n".join(texts)
         # Deep-Scan bekommt mehr Text
@@ -149,7 +355,7 @@ def scrape_website(url: str, deep: bool = False) -> dict:
 
         # Keyword-Treffer
         text_lower = full_text.lower()
-        result["keyword_hits"] = [kw for kw in keywords if kw.lower() in text_lower]
+        result["keyword_hits"] = [kw for kw, needle in keywords if needle in text_lower]
 
     except requests.exceptions.ConnectionError:
         result["error"] = "Website nicht erreichbar"
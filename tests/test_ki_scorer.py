@@ -0,0 +1,34 @@
+"""
+Tests für ki_scorer – Vertrauen-Bonus wie im ursprünglichen Range-Vergleich.
+Aufruf aus dem Projektverzeichnis: python -m pytest
+"""
+import numpy as np
+import pytest
+
+from ki_scorer import calculate_ki_score, calculate_ki_scores_batch
+
+
+@pytest.mark.parametrize("vertrauen, erwartet", [
+    (49, 5),     # range(0, 50): -1
+    (50, 6),     # range(50, 70): 0
+    (70, 7),     # range(70, 90): +1
+    (90, 8),     # range(90, 101): +2
+    (70.0, 7),   # ganzzahliger float zählt wie int
+])
+def test_vertrauen_schwellen(vertrauen, erwartet):
+    assert calculate_ki_score("INTEGRATION", vertrauen)["score"] == erwartet
+
+
+@pytest.mark.parametrize("vertrauen", [49.5, 69.9, 89.9, 100.5, float("nan")])
+def test_vertrauen_float_knapp_unter_schwelle_ohne_bonus(vertrauen):
+    # `vertrauen in range(...)` ist für nicht-ganze Werte nie wahr -> Bonus 0
+    assert calculate_ki_score("INTEGRATION", vertrauen)["score"] == 6
+
+
+def test_batch_wie_einzelfall():
+    werte = [-1, 0, 49, 49.5, 50, 69.9, 70, 89.9, 90, 100, 100.5, 101, float("nan")]
+    batch = calculate_ki_scores_batch(["INTEGRATION"] * len(werte),
+                                      np.array(werte, dtype=float),
+                                      [0] * len(werte), [0] * len(werte))
+    einzeln = [calculate_ki_score("INTEGRATION", v)["score"] for v in werte]
+    assert batch["score"].tolist() == einzeln
@@ -2,79 +2,135 @@
 wirtschaftsdaten_importer.py
 Importiert Unternehmen direkt aus der Wirtschaftsdaten-Excel-Datei (Stormarn)
 """
-import pandas as pd
+import hashlib
 import io
+import threading
+import numpy as np
+import pandas as pd
+
+# python-calamine (optional) liest xlsx mit einem Rust-Parser statt openpyxl
+try:
+    import python_calamine  # noqa: F401
+    _EXCEL_ENGINE = "calamine"
+except ImportError:
+    _EXCEL_ENGINE = None
+
+BRANCHE_COL = "WZ 2008 - Haupttätigkeit - Beschreibung (*)"
+MA_COL = "Anzahl der Mitarbeiter (Zuletzt angegebener Wert) (*)"
+UMSATZ_COL = "Umsatz tsd  (zuletzt angegebener Wert)\ntsd EUR (*)"
+
+# Nur diese Spalten werden gelesen – alle anderen Spalten des Blatts nicht
+_USED_COLUMNS = frozenset({
+    "Name des Unternehmens", "Straße (*)", "Hausnummer (*)", "Postleitzahl",
+    "Ort", "Web Adresse (*)", BRANCHE_COL, MA_COL, UMSATZ_COL,
+})
+
+# Zellinhalte, die als leer gelten ("n.v." nur bei Kennzahlen)
+_NAN_TOKENS = ("nan", "NaN")
+_NAN_NV_TOKENS = ("nan", "NaN", "n.v.")
+
+# Geparste Dateien nach Inhalts-Hash – erneutes Hochladen/Neu-Rendern liest
+# die Excel nicht noch einmal
+LOAD_CACHE_SIZE = 8
+_LOAD_CACHE = {}  # blake2b(file_bytes) -> DataFrame
+_cache_lock = threading.Lock()  # Streamlit rendert Sessions in eigenen Threads
 
 
 def load_wirtschaftsdaten(file_bytes: bytes) -> tuple:
     """
     Liest die Wirtschaftsdaten-Excel und gibt einen sauberen DataFrame zurück.
+    Gleiche Dateien kommen aus dem Cache (als Kopie – Aufrufer dürfen ändern).
     Returns: (DataFrame, error_message)
     """
+    key = hashlib.blake2b(file_bytes, digest_size=16).digest()
+    with _cache_lock:
+        cached = _LOAD_CACHE.get(key)
+    if cached is not None:
+        return cached.copy(), None
+
+    result, error = _parse_wirtschaftsdaten(file_bytes)
+    if result is not None:
+        with _cache_lock:
+            if key not in _LOAD_CACHE and len(_LOAD_CACHE) >= LOAD_CACHE_SIZE:
+                _LOAD_CACHE.pop(next(iter(_LOAD_CACHE)))  # ältesten Eintrag verwerfen
+            _LOAD_CACHE[key] = result
+        result = result.copy()
+    return result, error
+
+
+def _parse_wirtschaftsdaten(file_bytes: bytes) -> tuple:
     try:
-        df = pd.read_excel(io.BytesIO(file_bytes), sheet_name="Tabelle1")
+        df = pd.read_excel(
+            io.BytesIO(file_bytes), sheet_name="Tabelle1", engine=_EXCEL_ENGINE,
+            usecols=lambda col: col in _USED_COLUMNS, dtype=str
+        )
 
         if "Name des Unternehmens" not in df.columns:
             return None, "Datei hat nicht das erwartete Format (Spalte 'Name des Unternehmens' fehlt)"
 
-        # Eindeutige Firmen
-        unique = df.drop_duplicates(subset=["Name des Unternehmens"]).copy()
+        # Eindeutige Firmen (erste Zeile je Name; wird nur gelesen – keine Kopie nötig)
+        unique = df[~df["Name des Unternehmens"].duplicated()]
+
+        # Nur gültige Firmen – vor allen anderen Spalten, damit verworfene
+        # Zeilen nicht mehr bereinigt werden
+        name = unique["Name des Unternehmens"].fillna("").astype(str).str.strip()
+        valid = name.str.len() > 2
+        unique, name = unique[valid], name[valid]
 
         # Relevante Spalten extrahieren
-        result = pd.DataFrame()
-        result["name"] = unique["Name des Unternehmens"].fillna("").astype(str).str.strip()
 
         # Adresse
         strasse = unique["Straße (*)"].fillna("").astype(str)
         hausnr = unique["Hausnummer (*)"].fillna("").astype(str)
-        hausnr = hausnr.apply(lambda x: "" if x in ["nan", "NaN"] else x)
-        strasse = strasse.apply(lambda x: "" if x in ["nan", "NaN"] else x)
-        result["adresse"] = (strasse + " " + hausnr).str.strip()
+        hausnr = _blank(hausnr, _NAN_TOKENS)
+        strasse = _blank(strasse, _NAN_TOKENS)
+        adresse = (strasse + " " + hausnr).str.strip()
 
-        result["plz"] = unique["Postleitzahl"].fillna("").astype(str)\
-            .str.replace(".0", "", regex=False).str.strip()
-        result["plz"] = result["plz"].apply(lambda x: "" if x in ["nan", "NaN"] else x)
+        plz = unique["Postleitzahl"].fillna("").astype(str)\
+            .str.removesuffix(".0").str.strip()
+        plz = _blank(plz, _NAN_TOKENS)
 
-        result["ort"] = unique["Ort"].fillna("").astype(str).str.strip()
-        result["ort"] = result["ort"].apply(lambda x: "" if x in ["nan", "NaN"] else x)
+        ort = _blank(unique["Ort"].fillna("").astype(str).str.strip(), _NAN_TOKENS)
 
         # Website normalisieren
-        result["website"] = unique["Web Adresse (*)"].fillna("").astype(str).str.strip()
-        result["website"] = result["website"].apply(_normalize_url)
+        website = _blank(unique["Web Adresse (*)"].fillna("").astype(str).str.strip(),
+                         _NAN_NV_TOKENS)
+        needs_scheme = (website != "") & ~website.str.startswith("http")
+        website = website.mask(needs_scheme, "https://" + website)
 
         # Branche (WZ Code Beschreibung kürzen)
-        branche_col = "WZ 2008 - Haupttätigkeit - Beschreibung (*)"
-        if branche_col in unique.columns:
-            result["branche"] = unique[branche_col].fillna("").astype(str)
-            result["branche"] = result["branche"].apply(
-                lambda x: "" if x in ["nan", "NaN"] else x[:80]
-            )
-        else:
-            result["branche"] = ""
+        branche = ""
+        if BRANCHE_COL in unique.columns:
+            branche = unique[BRANCHE_COL].fillna("").astype(str)
+            branche = _blank(branche, _NAN_TOKENS).str[:80]
 
         # Mitarbeiter
-        ma_col = "Anzahl der Mitarbeiter (Zuletzt angegebener Wert) (*)"
-        if ma_col in unique.columns:
-            result["mitarbeiter"] = unique[ma_col].fillna("").astype(str)\
-                .str.replace(".0", "", regex=False)
-            result["mitarbeiter"] = result["mitarbeiter"].apply(
-                lambda x: "" if x in ["nan", "NaN", "n.v."] else x
-            )
-        else:
-            result["mitarbeiter"] = ""
+        mitarbeiter = ""
+        if MA_COL in unique.columns:
+            mitarbeiter = unique[MA_COL].fillna("").astype(str).str.removesuffix(".0")
+            mitarbeiter = _blank(mitarbeiter, _NAN_NV_TOKENS)
 
         # Umsatz
-        umsatz_col = "Umsatz tsd  (zuletzt angegebener Wert)\ntsd EUR (*)"
-        if umsatz_col in unique.columns:
-            result["umsatz"] = unique[umsatz_col].fillna("").astype(str)
-            result["umsatz"] = result["umsatz"].apply(
-                lambda x: "" if x in ["nan", "NaN", "n.v."] else x
-            )
-        else:
-            result["umsatz"] = ""
-
-        # Nur gültige Firmen
-        result = result[result["name"].str.len() > 2].reset_index(drop=True)
+        umsatz = ""
+        if UMSATZ_COL in unique.columns:
+            umsatz = _blank(unique[UMSATZ_COL].fillna("").astype(str), _NAN_NV_TOKENS)
+
+        # Ein Konstruktor statt Spalte für Spalte anzuhängen
+        result = pd.DataFrame({
+            "name": name,
+            "adresse": adresse,
+            "plz": plz,
+            "ort": ort,
+            "website": website,
+            "branche": branche,
+            "mitarbeiter": mitarbeiter,
+            "umsatz": umsatz,
+        }, copy=False).reset_index(drop=True)
+
+        # Wenige verschiedene Werte: als category zählen/filtern Stats und
+        # Filter auf Integer-Codes statt auf Strings
+        for col in ("ort", "branche", "plz"):
+            result[col] = _as_category(result[col])
 
         return result, None
 
@@ -82,42 +138,62 @@ def load_wirtschaftsdaten(file_bytes: bytes) -> tuple:
         return None, str(e)
 
 
-def _normalize_url(url: str) -> str:
-    """Normalisiert eine URL."""
-    if not url or url in ["nan", "NaN", "n.v.", ""]:
-        return ""
-    url = url.strip()
-    if not url.startswith("http"):
-        url = "https://" + url
-    return url
+def _as_category(series: pd.Series) -> pd.Series:
+    """
+    category-Spalte mit Kategorien in Reihenfolge des ersten Auftretens –
+    value_counts() ordnet Gleichstände dann wie bei einer str-Spalte.
+    """
+    return series.astype(pd.CategoricalDtype(pd.unique(series)))
+
+
+def _top_counts(series: pd.Series, n: int) -> dict:
+    """Häufigste Werte; bei category ohne Kategorien, die nicht (mehr) vorkommen."""
+    counts = series.value_counts()
+    return counts[counts > 0].head(n).to_dict()
+
+
+def _in_cities(ort: pd.Series, cities_lower: set) -> np.ndarray:
+    """Bool-Array "Ort in cities_lower" – bei kategorialem Ort nur die Kategorien kleinschreiben."""
+    if isinstance(ort.dtype, pd.CategoricalDtype):
+        hit = ort.cat.categories.str.lower().isin(cities_lower)
+        # Code -1 (fehlender Wert) trifft das angehängte False
+        return np.append(hit, False)[ort.cat.codes.to_numpy()]
+    return ort.str.lower().isin(cities_lower).to_numpy()
+
+
+def _blank(series: pd.Series, tokens) -> pd.Series:
+    """Ersetzt Platzhalter wie "nan" vektorisiert durch "" (statt apply pro Zeile)."""
+    return series.mask(series.isin(tokens), "")
 
 
 def get_stats(df: pd.DataFrame) -> dict:
     """Gibt Statistiken über den DataFrame zurück."""
+    # Ein Stringvergleich für beide Zahlen
+    with_website = int((df["website"] != "").sum())
     return {
         "total": len(df),
-        "with_website": int((df["website"] != "").sum()),
-        "without_website": int((df["website"] == "").sum()),
-        "cities": df["ort"].value_counts().head(10).to_dict(),
-        "top_branches": df["branche"].value_counts().head(5).to_dict()
+        "with_website": with_website,
+        "without_website": len(df) - with_website,
+        "cities": _top_counts(df["ort"], 10),
+        "top_branches": _top_counts(df["branche"], 5)
     }
 
 
 def filter_companies(df: pd.DataFrame, only_with_website: bool = True,
                      cities: list = None, min_employees: int = None) -> pd.DataFrame:
     """Filtert Unternehmen nach Kriterien."""
-    filtered = df.copy()
+    # Alle Kriterien in eine Maske, dann ein einziger Ausschnitt (statt Kopie + Zwischen-Frames)
+    mask = np.ones(len(df), dtype=bool)
 
     if only_with_website:
-        filtered = filtered[filtered["website"] != ""]
+        mask &= (df["website"] != "").to_numpy()
 
     if cities:
-        cities_lower = [c.lower() for c in cities]
-        filtered = filtered[filtered["ort"].str.lower().isin(cities_lower)]
+        mask &= _in_cities(df["ort"], {c.lower() for c in cities})
 
     if min_employees:
-        filtered = filtered[
-            pd.to_numeric(filtered["mitarbeiter"], errors="coerce") >= min_employees
-        ]
+        # Nicht-numerische Angaben ("10-49", "") werden NaN und fallen heraus
+        mitarbeiter_n = pd.to_numeric(df["mitarbeiter"], errors="coerce")
+        mask &= (mitarbeiter_n >= min_employees).to_numpy()
 
-    return filtered.reset_index(drop=True)
+    return df[mask].reset_index(drop=True)